@@ -1,18 +1,23 @@
 import sqlite3
 
+from connection_pool import get_pool
+
 class DatabaseConnection:
     """
     A class-based context manager for handling SQLite database connections.
     """
-    def __init__(self, db_name):
+    def __init__(self, db_name, conn=None):
         """
         Initialize the context manager with the database name.
         
         Args:
             db_name (str): The name of the SQLite database file.
+            conn (sqlite3.Connection): Use this open connection instead of
+                opening one; it is left open on exit (default: None).
         """
         self.db_name = db_name
-        self.conn = None
+        self.owns_conn = conn is None
+        self.conn = conn
 
     def __enter__(self):
         """
@@ -21,12 +26,14 @@ class DatabaseConnection:
         Returns:
             sqlite3.Connection: The open database connection.
         """
-        self.conn = sqlite3.connect(self.db_name)
+        if self.owns_conn:
+            self.conn = sqlite3.connect(self.db_name)
         return self.conn
 
     def __exit__(self, exc_type, exc_value, traceback):
         """
-        Close the database connection.
+        Commit (or roll back if the block raised) and close the connection
+        if this context manager opened it.
         
         Args:
             exc_type: The type of the exception (if any).
@@ -34,7 +41,74 @@ class DatabaseConnection:
             traceback: The traceback (if any).
         """
         if self.conn:
-            self.conn.close()
+            try:
+                finish_transaction(self.conn, exc_type)
+            finally:
+                if self.owns_conn:
+                    self.conn.close()
+                    self.conn = None
+
+
+class PooledDatabaseConnection:
+    """
+    A DatabaseConnection variant that borrows from a shared ConnectionPool.
+    
+    Entering it in a loop reuses already open and tuned connections instead
+    of paying the connect cost every time.
+    """
+    def __init__(self, db_name, pool=None):
+        """
+        Initialize the context manager with the database name.
+        
+        Args:
+            db_name (str): The name of the SQLite database file.
+            pool (ConnectionPool): Pool to borrow from (default: the shared
+                pool for db_name).
+        """
+        self.db_name = db_name
+        self.pool = get_pool(db_name) if pool is None else pool
+        self.conn = None
+
+    def __enter__(self):
+        """
+        Borrow a connection from the pool and return it.
+        
+        Returns:
+            sqlite3.Connection: The borrowed database connection.
+        """
+        self.conn = self.pool.acquire()
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Commit (or roll back if the block raised) and return the connection
+        to the pool.
+        
+        Args:
+            exc_type: The type of the exception (if any).
+            exc_value: The exception instance (if any).
+            traceback: The traceback (if any).
+        """
+        conn, self.conn = self.conn, None
+        if conn:
+            try:
+                finish_transaction(conn, exc_type)
+            finally:
+                self.pool.release(conn)
+
+
+def finish_transaction(conn, exc_type):
+    """
+    Commit the open transaction, or roll it back if an exception occurred.
+    
+    Args:
+        conn (sqlite3.Connection): The connection to finish.
+        exc_type: The type of the exception raised in the with block (if any).
+    """
+    if exc_type is None:
+        conn.commit()
+    else:
+        conn.rollback()
 
 # Example usage with the context manager
 if __name__ == "__main__":
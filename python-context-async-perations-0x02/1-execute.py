@@ -1,10 +1,82 @@
 import sqlite3
+import functools
+from collections import namedtuple
+
+
+@functools.lru_cache(maxsize=128)
+def namedtuple_row(columns):
+    """
+    Build (and cache) a namedtuple class for a tuple of column names.
+    
+    Args:
+        columns (tuple): Column names from cursor.description.
+    
+    Returns:
+        type: A namedtuple class; invalid names are renamed to _0, _1, ...
+    """
+    return namedtuple("Row", columns, rename=True)
+
+
+@functools.lru_cache(maxsize=128)
+def slots_row(columns):
+    """
+    Build (and cache) a __slots__ class for a tuple of column names.
+    
+    Slots objects have no per-instance __dict__, so each row costs little
+    more than its values.
+    
+    Args:
+        columns (tuple): Column names from cursor.description.
+    
+    Returns:
+        type: A class whose constructor takes the column values in order.
+    """
+    fields = namedtuple_row(columns)._fields
+
+    def __init__(self, *values):
+        for field, value in zip(fields, values):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in fields)
+        return f"Row({values})"
+
+    return type("Row", (), {
+        "__slots__": fields,
+        "__init__": __init__,
+        "__repr__": __repr__,
+    })
+
+
+def slots_factory(columns):
+    """
+    Return a function converting row tuples to slots objects.
+    
+    The class is resolved once here rather than looked up for every row.
+    
+    Args:
+        columns (tuple): Column names from cursor.description.
+    
+    Returns:
+        function: Takes a row tuple and returns a slots object.
+    """
+    cls = slots_row(columns)
+    return lambda row: cls(*row)
+
+
+ROW_FACTORIES = {
+    "tuple": None,
+    "namedtuple": lambda columns: namedtuple_row(columns)._make,
+    "slots": slots_factory,
+}
+
 
 class ExecuteQuery:
     """
     A reusable context manager for executing parameterized SQL queries.
     """
-    def __init__(self, db_name, query, params=()):
+    def __init__(self, db_name, query, params=(), stream=False, chunk_size=500,
+                 row_factory="tuple", conn=None):
         """
         Initialize the context manager with database name, query, and parameters.
         
@@ -12,28 +84,73 @@ class ExecuteQuery:
             db_name (str): The name of the SQLite database file.
             query (str): The SQL query to execute.
             params (tuple): Parameters for the query (default: empty tuple).
+            stream (bool): Return an iterator that fetches rows in chunks
+                instead of a fully materialized list (default: False).
+            chunk_size (int): Rows fetched per fetchmany call when streaming
+                (default: 500).
+            row_factory (str): "tuple", "namedtuple" or "slots" (default: "tuple").
+            conn (sqlite3.Connection): Run on this open connection instead of
+                opening one; it is left open on exit (default: None).
         """
+        if row_factory not in ROW_FACTORIES:
+            raise ValueError(f"Unknown row factory: {row_factory}")
         self.db_name = db_name
         self.query = query
         self.params = params
-        self.conn = None
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.row_factory = row_factory
+        self.owns_conn = conn is None
+        self.conn = conn
         self.cursor = None
 
+    def _make_row(self):
+        """
+        Return the function converting a raw row tuple, or None for tuples.
+        """
+        factory = ROW_FACTORIES[self.row_factory]
+        if factory is None:
+            return None
+        columns = tuple(column[0] for column in self.cursor.description)
+        return factory(columns)
+
+    def _iter_rows(self, make_row):
+        """
+        Yield rows from the open cursor, chunk_size rows per fetch.
+        """
+        while True:
+            rows = self.cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            if make_row is None:
+                yield from rows
+            else:
+                yield from map(make_row, rows)
+
     def __enter__(self):
         """
         Open a database connection, create a cursor, execute the query, and return results.
         
         Returns:
-            list: The query results as a list of tuples.
+            list: The query results as a list of rows, or an iterator over the
+            rows when streaming. The iterator is only valid inside the with block.
         """
-        self.conn = sqlite3.connect(self.db_name)
+        if self.owns_conn:
+            self.conn = sqlite3.connect(self.db_name)
         self.cursor = self.conn.cursor()
         self.cursor.execute(self.query, self.params)
-        return self.cursor.fetchall()
+        make_row = self._make_row()
+        if self.stream:
+            return self._iter_rows(make_row)
+        rows = self.cursor.fetchall()
+        if make_row is None:
+            return rows
+        return [make_row(row) for row in rows]
 
     def __exit__(self, exc_type, exc_value, traceback):
         """
-        Close the cursor and database connection.
+        Close the cursor and, if this context manager opened it, the database
+        connection.
         
         Args:
             exc_type: The type of the exception (if any).
@@ -42,8 +159,10 @@ class ExecuteQuery:
         """
         if self.cursor:
             self.cursor.close()
-        if self.conn:
+            self.cursor = None
+        if self.conn and self.owns_conn:
             self.conn.close()
+            self.conn = None
 
 # Example usage with the context manager
 if __name__ == "__main__":
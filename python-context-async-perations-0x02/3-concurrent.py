@@ -1,40 +1,227 @@
 import asyncio
+import contextlib
 import aiosqlite
+from collections import namedtuple
 
-async def async_fetch_users():
+from async_pool import AsyncConnectionPool, get_async_pool
+
+# One finished job from execute_queries; error is set instead of rows on failure
+QueryResult = namedtuple("QueryResult", "index query params rows error")
+
+async def async_fetch_users(router=None):
     """
     Asynchronously fetch all users from the database.
     
+    Args:
+        router (QueryRouter): Send the query through a read/write router
+            instead of opening a connection (default: None).
+    
     Returns:
         list: List of tuples containing all user records.
     """
+    if router is not None:
+        return await router.fetchall("SELECT * FROM users")
     async with aiosqlite.connect('users.db') as conn:
         cursor = await conn.execute("SELECT * FROM users")
         results = await cursor.fetchall()
         await cursor.close()
         return results
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(router=None):
     """
     Asynchronously fetch users older than 40 from the database.
     
+    Args:
+        router (QueryRouter): Send the query through a read/write router
+            instead of opening a connection (default: None).
+    
     Returns:
         list: List of tuples containing user records with age > 40.
     """
+    if router is not None:
+        return await router.fetchall("SELECT * FROM users WHERE age > ?", (40,))
     async with aiosqlite.connect('users.db') as conn:
         cursor = await conn.execute("SELECT * FROM users WHERE age > ?", (40,))
         results = await cursor.fetchall()
         await cursor.close()
         return results
 
-async def fetch_concurrently():
+async def _cancel(task):
+    """
+    Cancel a pending prefetch task and wait for it to finish.
+    """
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, aiosqlite.Error):
+        pass
+
+async def _fetch_chunks(query, params, chunk_size, prefetch, pool):
+    """
+    Async generator yielding fetchmany chunks of a query's rows.
+    
+    Rows are only read as the consumer asks for them: at most one chunk is
+    fetched ahead (with prefetch), so a slow consumer holds back the scan
+    instead of letting results pile up in memory.
+    
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple): Parameters for the query.
+        chunk_size (int): Rows per chunk.
+        prefetch (bool): Fetch the next chunk while the current one is
+            being consumed.
+        pool (AsyncConnectionPool): Pool to borrow the connection from
+            (default: the shared pool for users.db, which the caller
+            closes with async_pool.close_async_pools()).
+    
+    Yields:
+        list: Chunk of row tuples.
+    """
+    if pool is None:
+        pool = get_async_pool('users.db')
+    pending = None
+    async with pool.connection() as conn:
+        cursor = await conn.execute(query, params)
+        try:
+            pending = asyncio.ensure_future(cursor.fetchmany(chunk_size))
+            while True:
+                chunk = await pending
+                pending = None
+                if not chunk:
+                    break
+                if prefetch:
+                    pending = asyncio.ensure_future(cursor.fetchmany(chunk_size))
+                yield chunk
+                if not prefetch:
+                    pending = asyncio.ensure_future(cursor.fetchmany(chunk_size))
+        finally:
+            await _cancel(pending)
+            await cursor.close()
+
+async def async_stream_users(chunk_size=500, prefetch=True, pool=None):
+    """
+    Asynchronously stream all users from the database in chunks.
+    
+    Args:
+        chunk_size (int): Rows per chunk (default: 500).
+        prefetch (bool): Overlap fetching with consumption (default: True).
+        pool (AsyncConnectionPool): Pool to read from (default: None for the
+            shared users.db pool; see async_pool.close_async_pools).
+    
+    Yields:
+        list: Chunk of tuples containing user records.
+    """
+    # aclosing: closing this stream early must close the scan right away
+    async with contextlib.aclosing(_fetch_chunks(
+            "SELECT * FROM users", (), chunk_size, prefetch, pool)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+async def async_stream_older_users(chunk_size=500, prefetch=True, pool=None):
+    """
+    Asynchronously stream users older than 40 from the database in chunks.
+    
+    Args:
+        chunk_size (int): Rows per chunk (default: 500).
+        prefetch (bool): Overlap fetching with consumption (default: True).
+        pool (AsyncConnectionPool): Pool to read from (default: None for the
+            shared users.db pool; see async_pool.close_async_pools).
+    
+    Yields:
+        list: Chunk of tuples containing user records with age > 40.
+    """
+    async with contextlib.aclosing(_fetch_chunks(
+            "SELECT * FROM users WHERE age > ?", (40,), chunk_size, prefetch,
+            pool)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+async def fetch_concurrently(router=None):
     """
     Execute async_fetch_users and async_fetch_older_users concurrently.
     
+    Args:
+        router (QueryRouter): Read/write router both fetchers go through
+            (default: None to open a connection each).
+    
     Returns:
         tuple: Results of both queries (all users, older users).
     """
-    results = await asyncio.gather(async_fetch_users(), async_fetch_older_users())
+    results = await asyncio.gather(async_fetch_users(router), async_fetch_older_users(router))
+    return results
+
+async def execute_queries(jobs, concurrency=10, timeout=None, pool=None):
+    """
+    Run (query, params) jobs concurrently and yield results as they complete.
+    
+    At most concurrency queries run at once, all over one shared connection
+    pool. A query that fails or exceeds timeout yields a QueryResult with
+    its error instead of stopping the others. Closing the generator early
+    (or cancelling its consumer) cancels every job still pending.
+    
+    Args:
+        jobs (iterable): (query, params) pairs.
+        concurrency (int): Maximum number of queries in flight (default: 10).
+        timeout (float): Per-query time limit in seconds, including the wait
+            for a connection (default: None for no limit).
+        pool (AsyncConnectionPool): Pool to run on (default: a private
+            pool for users.db with concurrency connections, closed when the
+            generator finishes).
+    
+    Yields:
+        QueryResult: Finished jobs in completion order; index is the job's
+        position in jobs.
+    """
+    private_pool = pool is None
+    if private_pool:
+        pool = AsyncConnectionPool('users.db', size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index, query, params):
+        async with semaphore:
+            try:
+                rows = await asyncio.wait_for(pool.fetchall(query, params), timeout)
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"Query exceeded {timeout} s")
+                return QueryResult(index, query, params, None, error)
+            except Exception as e:
+                return QueryResult(index, query, params, None, e)
+            return QueryResult(index, query, params, rows, None)
+
+    tasks = [asyncio.ensure_future(run(index, query, params))
+             for index, (query, params) in enumerate(jobs)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if private_pool:
+            await pool.close()
+
+async def gather_queries(jobs, **options):
+    """
+    Run jobs with execute_queries and return their rows in job order.
+    
+    Args:
+        jobs (iterable): (query, params) pairs.
+        **options: concurrency, timeout and pool, as for execute_queries.
+    
+    Returns:
+        list: One list of rows per job.
+    
+    Raises:
+        Exception: The error of the first job that failed.
+    """
+    jobs = list(jobs)
+    results = [None] * len(jobs)
+    async for result in execute_queries(jobs, **options):
+        if result.error is not None:
+            raise result.error
+        results[result.index] = result.rows
     return results
 
 # Example usage
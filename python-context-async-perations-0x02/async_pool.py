@@ -0,0 +1,228 @@
+import asyncio
+import weakref
+import contextlib
+
+import aiosqlite
+
+from connection_pool import TUNING_PROFILE
+
+
+class AsyncConnectionPool:
+    """
+    An asyncio pool of aiosqlite connections, the async counterpart of
+    connection_pool.ConnectionPool.
+
+    Every aiosqlite connection runs its queries on its own thread, so the
+    pool size is also the number of queries that can run at once. The pool
+    must only be used from the event loop it was created on, and closed
+    before that loop ends: with close(), or by using the pool as an async
+    context manager. Open connections' threads keep the interpreter alive.
+    """
+    def __init__(self, db_name, size=5, timeout=30, pragmas=None, uri=False):
+        """
+        Initialize an empty pool.
+
+        Args:
+            db_name (str): The SQLite database file, or a file: URI if uri is set.
+            size (int): Maximum number of open connections (default: 5).
+            timeout (float): Seconds to wait for a free connection (default: 30).
+            pragmas (dict): PRAGMA name to value mapping applied to new
+                connections (default: TUNING_PROFILE).
+            uri (bool): Interpret db_name as a URI (default: False).
+        """
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = TUNING_PROFILE if pragmas is None else pragmas
+        self.uri = uri
+        self._idle = []
+        self._created = 0
+        self._condition = asyncio.Condition()
+
+    async def _connect(self):
+        """
+        Open a new connection and apply the PRAGMA settings.
+        """
+        conn = await aiosqlite.connect(self.db_name, uri=self.uri)
+        for name, value in self.pragmas.items():
+            await conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    async def acquire(self):
+        """
+        Borrow a connection, waiting if all of them are in use.
+
+        Returns:
+            aiosqlite.Connection: The borrowed connection.
+
+        Raises:
+            TimeoutError: If no connection became free within timeout.
+        """
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(
+                        lambda: self._idle or self._created < self.size),
+                    self.timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError("Timed out waiting for a database connection") from None
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return await self._connect()
+        except BaseException:
+            async with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    async def release(self, conn):
+        """
+        Return a connection to the pool, rolling back any open transaction.
+
+        Args:
+            conn: A connection obtained from acquire.
+        """
+        if conn.in_transaction:
+            await conn.rollback()
+        async with self._condition:
+            self._idle.append(conn)
+            self._condition.notify()
+
+    async def discard(self, conn):
+        """
+        Interrupt whatever a borrowed connection is running and close it
+        instead of returning it to the pool.
+
+        Args:
+            conn: A connection obtained from acquire.
+        """
+        # interrupt() bypasses the connection's queue, so it stops a query
+        # that is still running on the connection's thread
+        await conn.interrupt()
+        async with self._condition:
+            self._created -= 1
+            self._condition.notify()
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        """
+        Borrow a connection for the duration of an async with block.
+
+        If the block is cancelled (for example by a timeout) its query may
+        still be running, so the connection is discarded rather than handed
+        to the next borrower. An async generator closed early leaves the
+        block at a yield, between queries, so its connection is released.
+
+        Yields:
+            aiosqlite.Connection: The borrowed connection.
+        """
+        conn = await self.acquire()
+        try:
+            yield conn
+        except (Exception, GeneratorExit):
+            await self.release(conn)
+            raise
+        except BaseException:
+            await self.discard(conn)
+            raise
+        else:
+            await self.release(conn)
+
+    async def fetchall(self, query, params=()):
+        """
+        Run a query on a pooled connection and return all rows.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (tuple): Parameters for the query (default: empty tuple).
+
+        Returns:
+            list: The query results as a list of tuples.
+        """
+        async with self.connection() as conn:
+            # Not "async with": closing the cursor on cancellation would
+            # queue behind the query it is meant to abandon
+            cursor = await conn.execute(query, params)
+            rows = await cursor.fetchall()
+            await cursor.close()
+            return rows
+
+    async def close(self):
+        """
+        Close every idle connection.
+        """
+        async with self._condition:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn in idle:
+            await conn.close()
+
+    async def __aenter__(self):
+        """
+        Return the pool; connections are opened on first use.
+
+        Returns:
+            AsyncConnectionPool: The pool itself.
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Close every idle connection.
+
+        Args:
+            exc_type: The type of the exception (if any).
+            exc_value: The exception instance (if any).
+            traceback: The traceback (if any).
+        """
+        await self.close()
+
+
+_pools = weakref.WeakKeyDictionary()
+
+
+def get_async_pool(db_name='users.db', **options):
+    """
+    Return the shared pool for a database file on the running event loop.
+
+    Call close_async_pools() before the loop ends.
+
+    Args:
+        db_name (str): The name of the SQLite database file (default: 'users.db').
+        **options: AsyncConnectionPool arguments, used when the pool is
+            created and checked against it afterwards.
+
+    Returns:
+        AsyncConnectionPool: The pool shared by callers on this loop.
+
+    Raises:
+        ValueError: If options conflict with the existing pool's settings.
+    """
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    pool = pools.get(db_name)
+    if pool is None:
+        pool = pools[db_name] = AsyncConnectionPool(db_name, **options)
+        return pool
+    for name, value in options.items():
+        if name == "pragmas" and value is None:
+            value = TUNING_PROFILE
+        if getattr(pool, name) != value:
+            raise ValueError(
+                f"Shared pool for {db_name} has {name}={getattr(pool, name)!r}, "
+                f"not {value!r}")
+    return pool
+
+
+async def close_async_pools():
+    """
+    Close and forget every shared pool of the running event loop.
+    """
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.close()
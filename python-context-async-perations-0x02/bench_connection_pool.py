@@ -0,0 +1,40 @@
+import sys
+import time
+import threading
+
+module = __import__('0-databaseconnection')
+DatabaseConnection = module.DatabaseConnection
+PooledDatabaseConnection = module.PooledDatabaseConnection
+
+
+def run(manager, db_name, iterations):
+    """
+    Enter the context manager iterations times, running one lookup each time.
+    """
+    for i in range(iterations):
+        with manager(db_name) as conn:
+            conn.execute("SELECT * FROM users WHERE id = ?", (i % 100,)).fetchall()
+
+
+def timed(manager, db_name, iterations, threads):
+    """
+    Return calls per second across the given number of threads.
+    """
+    workers = [threading.Thread(target=run, args=(manager, db_name, iterations))
+               for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return iterations * threads / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    db_name = sys.argv[1] if len(sys.argv) > 1 else 'users.db'
+    iterations = 2000
+    for threads in (1, 4, 16):
+        plain = timed(DatabaseConnection, db_name, iterations, threads)
+        pooled = timed(PooledDatabaseConnection, db_name, iterations, threads)
+        print(f"{threads:>2} threads: connect per call {plain:,.0f}/s, pooled {pooled:,.0f}/s")
+    print(PooledDatabaseConnection(db_name).pool.stats())
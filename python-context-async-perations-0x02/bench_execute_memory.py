@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from bench_executor import create_users
+
+ExecuteQuery = __import__('1-execute').ExecuteQuery
+
+
+def peak_memory(db_name, **options):
+    """
+    Run SELECT * FROM users WHERE age > ? and return (rows, peak bytes).
+    """
+    tracemalloc.start()
+    count = 0
+    with ExecuteQuery(db_name, "SELECT * FROM users WHERE age > ?", (25,), **options) as rows:
+        for _ in rows:
+            count += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "bench_users.db")
+    create_users(db_name, rows)
+    try:
+        for label, options in (
+            ("fetchall, tuples", {}),
+            ("fetchall, slots", {"row_factory": "slots"}),
+            ("stream, tuples", {"stream": True}),
+            ("stream, namedtuples", {"stream": True, "row_factory": "namedtuple"}),
+            ("stream, slots", {"stream": True, "row_factory": "slots"}),
+        ):
+            count, peak = peak_memory(db_name, **options)
+            print(f"{label}: {count} rows, peak {peak / 1024:,.0f} KiB")
+    finally:
+        os.remove(db_name)
+        os.rmdir(directory)
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import sqlite3
+import asyncio
+import tempfile
+
+import aiosqlite
+
+concurrent = __import__('3-concurrent')
+
+
+def create_users(db_name, rows):
+    """
+    Create a users table with the given number of rows.
+    """
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, age INTEGER)")
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?)",
+        ((i, f"User {i}", f"user{i}@example.com", 18 + i % 80) for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_jobs(count):
+    """
+    Build count aggregate queries that each scan the users table.
+    """
+    return [("SELECT count(*), avg(age) FROM users WHERE age > ? AND id % 7 = ?",
+             (i % 60, i % 7))
+            for i in range(count)]
+
+
+async def serial(db_name, jobs):
+    """
+    Run every job one after another on a single connection.
+    """
+    async with aiosqlite.connect(db_name) as conn:
+        for query, params in jobs:
+            async with conn.execute(query, params) as cursor:
+                await cursor.fetchall()
+
+
+async def fan_out(db_name, jobs, concurrency):
+    """
+    Run every job through execute_queries with the given concurrency.
+    """
+    pool = concurrent.AsyncConnectionPool(db_name, size=concurrency)
+    try:
+        async for result in concurrent.execute_queries(jobs, concurrency, pool=pool):
+            if result.error is not None:
+                raise result.error
+    finally:
+        await pool.close()
+
+
+def timed(coroutine):
+    """
+    Return the wall-clock seconds taken to run a coroutine.
+    """
+    start = time.perf_counter()
+    asyncio.run(coroutine)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "bench_users.db")
+    create_users(db_name, rows)
+    jobs = make_jobs(1000)
+    try:
+        print(f"serial: {timed(serial(db_name, jobs)):.3f} s")
+        for concurrency in (1, 4, 8, 16):
+            seconds = timed(fan_out(db_name, jobs, concurrency))
+            print(f"concurrency {concurrency:>2}: {seconds:.3f} s")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_name + suffix):
+                os.remove(db_name + suffix)
+        os.rmdir(directory)
@@ -0,0 +1,78 @@
+import os
+import sys
+import asyncio
+import tempfile
+import tracemalloc
+
+concurrent = __import__('3-concurrent')
+from loop_lag import LoopLagMonitor
+from bench_executor import create_users
+
+
+def process(rows):
+    """
+    Simulate per-row work done by the consumer.
+    """
+    total = 0
+    for row in rows:
+        total += len(row[1]) + len(row[2]) + row[3]
+    return total
+
+
+async def with_fetchall(pool):
+    """
+    Load the whole table with fetchall, then process it.
+    """
+    async with pool.connection() as conn:
+        async with conn.execute("SELECT * FROM users") as cursor:
+            rows = await cursor.fetchall()
+    return process(rows)
+
+
+async def with_stream(pool, chunk_size):
+    """
+    Process the table chunk by chunk through async_stream_users.
+    """
+    total = 0
+    async for chunk in concurrent.async_stream_users(chunk_size, pool=pool):
+        total += process(chunk)
+    return total
+
+
+async def measure(db_name, scan):
+    """
+    Run a scan under the lag monitor and tracemalloc.
+    """
+    pool = concurrent.AsyncConnectionPool(db_name, size=1)
+    try:
+        async with pool.connection():
+            pass
+        tracemalloc.start()
+        async with LoopLagMonitor() as monitor:
+            await scan(pool)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return monitor.stats(), peak
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "bench_users.db")
+    create_users(db_name, rows)
+    try:
+        for label, scan in (
+            ("fetchall", with_fetchall),
+            ("stream 500", lambda pool: with_stream(pool, 500)),
+            ("stream 5000", lambda pool: with_stream(pool, 5000)),
+        ):
+            lag, peak = asyncio.run(measure(db_name, scan))
+            print(f"{label:>11}: max lag {lag['max_ms']:.1f} ms, "
+                  f"p99 {lag['p99_ms']:.1f} ms, peak memory {peak / 1024:,.0f} KiB")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_name + suffix):
+                os.remove(db_name + suffix)
+        os.rmdir(directory)
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+from query_router import QueryRouter
+from bench_executor import create_users
+
+QUERY = "SELECT count(*), avg(age) FROM users WHERE age > ? AND id % 7 = ?"
+
+
+async def read_throughput(db_name, readers, queries, immutable):
+    """
+    Return read queries per second through a router with the given readers.
+    """
+    async with QueryRouter(db_name, readers=readers, immutable=immutable) as router:
+        await router.fetchall("SELECT 1")
+        start = time.perf_counter()
+        await asyncio.gather(*(router.fetchall(QUERY, (i % 60, i % 7))
+                               for i in range(queries)))
+        return queries / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "bench_users.db")
+    create_users(db_name, rows)
+    try:
+        for immutable in (False, True):
+            for readers in (1, 2, 4, 8):
+                rate = asyncio.run(read_throughput(db_name, readers, 500, immutable))
+                mode = "immutable" if immutable else "mode=ro"
+                print(f"{mode:>9}, {readers} readers: {rate:,.0f} reads/s")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_name + suffix):
+                os.remove(db_name + suffix)
+        os.rmdir(directory)
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+from loop_lag import LoopLagMonitor
+from thread_backend import ExecuteQuery, ThreadPoolBackend
+from bench_executor import create_users, make_jobs
+
+
+async def blocking(db_name, jobs):
+    """
+    Call the synchronous ExecuteQuery straight from coroutines.
+    """
+    async def run(query, params):
+        with ExecuteQuery(db_name, query, params) as rows:
+            return rows
+    await asyncio.gather(*(run(query, params) for query, params in jobs))
+
+
+async def offloaded(backend, jobs):
+    """
+    Run the same jobs through the thread pool backend.
+    """
+    async def run(query, params):
+        async with backend.execute_query(query, params) as rows:
+            return rows
+    await asyncio.gather(*(run(query, params) for query, params in jobs))
+
+
+async def measure(scan):
+    """
+    Return wall-clock seconds and loop lag stats for a coroutine.
+    """
+    async with LoopLagMonitor() as monitor:
+        start = time.perf_counter()
+        await scan
+        seconds = time.perf_counter() - start
+    return seconds, monitor.stats()
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    db_name = os.path.join(directory, "bench_users.db")
+    create_users(db_name, rows)
+    jobs = make_jobs(200)
+    try:
+        seconds, lag = asyncio.run(measure(blocking(db_name, jobs)))
+        print(f"sync in loop: {seconds:.3f} s, max lag {lag['max_ms']:.1f} ms")
+        for workers in (1, 4):
+            backend = ThreadPoolBackend(db_name, max_workers=workers)
+            try:
+                seconds, lag = asyncio.run(measure(offloaded(backend, jobs)))
+                stats = backend.stats()
+            finally:
+                backend.close()
+            print(f"{workers} workers: {seconds:.3f} s, max lag {lag['max_ms']:.1f} ms, "
+                  f"max queue {stats['max_queue_depth']}, "
+                  f"p99 latency {stats['p99_latency_ms']:.1f} ms")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_name + suffix):
+                os.remove(db_name + suffix)
+        os.rmdir(directory)
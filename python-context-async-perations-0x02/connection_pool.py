@@ -0,0 +1,178 @@
+import time
+import sqlite3
+import threading
+
+# Applied once to every new connection
+TUNING_PROFILE = {
+    "journal_mode": "WAL",
+    "mmap_size": 268435456,  # Map up to 256 MiB of the file instead of read()
+    "cache_size": -16000,    # 16 MiB page cache per connection
+    "busy_timeout": 5000,    # Wait up to 5 s on a locked database
+}
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of SQLite connections with occupancy and wait metrics.
+
+    Connections are opened lazily up to size and tuned once with the PRAGMA
+    settings of the tuning profile, then reused by every borrower.
+    """
+    def __init__(self, db_name, size=5, timeout=30, pragmas=None):
+        """
+        Initialize an empty pool.
+
+        Args:
+            db_name (str): The name of the SQLite database file.
+            size (int): Maximum number of open connections (default: 5).
+            timeout (float): Seconds to wait for a free connection (default: 30).
+            pragmas (dict): PRAGMA name to value mapping applied to new
+                connections (default: TUNING_PROFILE).
+        """
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = TUNING_PROFILE if pragmas is None else pragmas
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+        self._metrics = {
+            "acquires": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "peak_in_use": 0,
+        }
+
+    def _connect(self):
+        """
+        Open a new connection and apply the tuning profile.
+        """
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self):
+        """
+        Borrow a connection, waiting if all of them are in use.
+
+        Returns:
+            sqlite3.Connection: The borrowed connection.
+
+        Raises:
+            TimeoutError: If no connection became free within timeout.
+        """
+        start = time.perf_counter()
+        waited = False
+        with self._condition:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    conn = None
+                    break
+                waited = True
+                remaining = self.timeout - (time.perf_counter() - start)
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    if not self._idle and self._created >= self.size:
+                        self._metrics["timeouts"] += 1
+                        raise TimeoutError("Timed out waiting for a database connection")
+            self._record_acquire(time.perf_counter() - start, waited)
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._condition:
+                    self._created -= 1
+                    self._condition.notify()
+                raise
+        return conn
+
+    def _record_acquire(self, wait, waited):
+        """
+        Update the acquire metrics; the caller holds the condition lock.
+        """
+        metrics = self._metrics
+        metrics["acquires"] += 1
+        if waited:
+            metrics["waits"] += 1
+            metrics["wait_seconds"] += wait
+            metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], wait)
+        in_use = self._created - len(self._idle)
+        metrics["peak_in_use"] = max(metrics["peak_in_use"], in_use)
+
+    def release(self, conn):
+        """
+        Return a connection to the pool, rolling back any open transaction.
+
+        Args:
+            conn: A connection obtained from acquire.
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        with self._condition:
+            self._idle.append(conn)
+            self._condition.notify()
+
+    def stats(self):
+        """
+        Return a snapshot of pool occupancy and wait-time metrics.
+
+        Returns:
+            dict: Open, idle and in-use connection counts plus acquire, wait
+            and timeout counters; wait times are in milliseconds.
+        """
+        with self._condition:
+            metrics = dict(self._metrics)
+            open_connections = self._created
+            idle = len(self._idle)
+        waits = metrics.pop("waits")
+        wait_seconds = metrics.pop("wait_seconds")
+        return {
+            "size": self.size,
+            "open": open_connections,
+            "idle": idle,
+            "in_use": open_connections - idle,
+            "peak_in_use": metrics["peak_in_use"],
+            "acquires": metrics["acquires"],
+            "waits": waits,
+            "timeouts": metrics["timeouts"],
+            "avg_wait_ms": wait_seconds * 1000 / waits if waits else 0.0,
+            "max_wait_ms": metrics["max_wait_seconds"] * 1000,
+        }
+
+    def close_all(self):
+        """
+        Close every idle connection.
+        """
+        with self._condition:
+            for conn in self._idle:
+                conn.close()
+                self._created -= 1
+            self._idle = []
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_name, **options):
+    """
+    Return the shared pool for a database file, creating it on first use.
+
+    Args:
+        db_name (str): The name of the SQLite database file.
+        **options: ConnectionPool arguments, used only when the pool is created.
+
+    Returns:
+        ConnectionPool: The pool shared by every caller of this database.
+    """
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = _pools[db_name] = ConnectionPool(db_name, **options)
+        return pool
@@ -0,0 +1,89 @@
+import time
+import asyncio
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop responsiveness while a block of async code runs.
+
+    A background task asks to wake up every interval seconds and records
+    how late it actually woke. Any code that holds the loop without
+    awaiting shows up as lag.
+
+    Usage:
+        async with LoopLagMonitor() as monitor:
+            await scan()
+        print(monitor.stats())
+    """
+    def __init__(self, interval=0.005):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval (float): Seconds between probes (default: 0.005).
+        """
+        self.interval = interval
+        self.samples = []
+        self._task = None
+        self._sleep_started = None
+
+    async def _probe(self):
+        """
+        Sleep for interval repeatedly and record how late each wakeup was.
+        """
+        while True:
+            self._sleep_started = start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._sleep_started = None
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    async def __aenter__(self):
+        """
+        Start probing the running loop.
+
+        Returns:
+            LoopLagMonitor: The monitor itself.
+        """
+        self.samples = []
+        self._task = asyncio.ensure_future(self._probe())
+        # Let the probe take its first timestamp before the block runs
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Stop probing.
+
+        Args:
+            exc_type: The type of the exception (if any).
+            exc_value: The exception instance (if any).
+            traceback: The traceback (if any).
+        """
+        # A probe the block kept from waking up still counts as lag
+        if self._sleep_started is not None:
+            overdue = time.perf_counter() - self._sleep_started - self.interval
+            if overdue > 0:
+                self.samples.append(overdue)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self):
+        """
+        Summarize the recorded lag.
+
+        Returns:
+            dict: Number of probes and mean, p99 and max lag in milliseconds.
+        """
+        if not self.samples:
+            return {"probes": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.samples)
+        return {
+            "probes": len(ordered),
+            "mean_ms": sum(ordered) * 1000 / len(ordered),
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
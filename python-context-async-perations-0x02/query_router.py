@@ -0,0 +1,203 @@
+import re
+import asyncio
+import pathlib
+
+import aiosqlite
+
+from connection_pool import TUNING_PROFILE
+
+# Statements that only read; WITH is excluded when it wraps a write
+READ_QUERY = re.compile(r"^\s*(SELECT|WITH|EXPLAIN)\b", re.IGNORECASE)
+WRITE_KEYWORD = re.compile(r"\b(INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+# journal_mode cannot be changed on a read-only connection
+READER_PRAGMAS = {name: value for name, value in TUNING_PROFILE.items()
+                  if name != "journal_mode"}
+
+
+def is_read_only(query):
+    """
+    Tell whether a SQL statement only reads.
+
+    Args:
+        query (str): The SQL statement.
+
+    Returns:
+        bool: True for SELECT/WITH/EXPLAIN statements that do not write.
+    """
+    return bool(READ_QUERY.match(query)) and not WRITE_KEYWORD.search(query)
+
+
+def read_only_uri(db_name, immutable=False):
+    """
+    Build the URI that opens a database file read-only.
+
+    Args:
+        db_name (str): The name of the SQLite database file.
+        immutable (bool): Also promise SQLite the file never changes, which
+            skips all locking (default: False).
+
+    Returns:
+        str: A file: URI for sqlite3/aiosqlite with uri=True.
+    """
+    uri = pathlib.Path(db_name).resolve().as_uri() + "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+class QueryRouter:
+    """
+    Routes read-only queries to a set of read-only connections and writes
+    to a single writer connection.
+
+    Each aiosqlite connection runs on its own thread, so readers execute in
+    parallel. A read goes to the reader with the fewest outstanding queries.
+    Writes are serialized on the writer, as SQLite allows only one writer.
+
+    The connections' threads keep the interpreter alive until they are
+    closed, so close the router with close() or use it as an async context
+    manager.
+
+    Usage:
+        async with QueryRouter('users.db', readers=4) as router:
+            rows = await router.fetchall("SELECT * FROM users")
+    """
+    def __init__(self, db_name='users.db', readers=4, immutable=False):
+        """
+        Initialize the router; connections are opened on first use.
+
+        Args:
+            db_name (str): The name of the SQLite database file (default: 'users.db').
+            readers (int): Number of read-only connections (default: 4).
+            immutable (bool): Open readers with immutable=1. Only safe when
+                nothing modifies the file, so writes are refused (default: False).
+        """
+        self.db_name = db_name
+        self.reader_count = readers
+        self.immutable = immutable
+        self._readers = None
+        self._outstanding = [0] * readers
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+        self._reads = 0
+        self._writes = 0
+
+    @staticmethod
+    async def _connect(database, pragmas, uri=False):
+        """
+        Open a connection and apply the PRAGMA settings.
+        """
+        conn = await aiosqlite.connect(database, uri=uri)
+        for name, value in pragmas.items():
+            await conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    async def _open_readers(self):
+        """
+        Open the read-only connections once.
+        """
+        async with self._open_lock:
+            if self._readers is None:
+                uri = read_only_uri(self.db_name, self.immutable)
+                self._readers = await asyncio.gather(*(
+                    self._connect(uri, READER_PRAGMAS, uri=True)
+                    for _ in range(self.reader_count)))
+        return self._readers
+
+    async def fetchall(self, query, params=()):
+        """
+        Run a query and return all rows, routing it by whether it writes.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (tuple): Parameters for the query (default: empty tuple).
+
+        Returns:
+            list: The query results as a list of tuples.
+        """
+        if not is_read_only(query):
+            return await self.execute(query, params)
+        readers = self._readers or await self._open_readers()
+        index = min(range(len(readers)), key=self._outstanding.__getitem__)
+        self._outstanding[index] += 1
+        self._reads += 1
+        try:
+            async with readers[index].execute(query, params) as cursor:
+                return await cursor.fetchall()
+        finally:
+            self._outstanding[index] -= 1
+
+    async def execute(self, query, params=()):
+        """
+        Run a statement on the writer connection and commit it.
+
+        Args:
+            query (str): The SQL statement to execute.
+            params (tuple): Parameters for the statement (default: empty tuple).
+
+        Returns:
+            list: Any rows the statement returned.
+
+        Raises:
+            ValueError: If the readers were opened immutable.
+        """
+        if self.immutable:
+            raise ValueError("Writes are not allowed on an immutable router")
+        async with self._write_lock:
+            if self._writer is None:
+                self._writer = await self._connect(self.db_name, TUNING_PROFILE)
+            self._writes += 1
+            try:
+                async with self._writer.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
+            return rows
+
+    def stats(self):
+        """
+        Return routing counters and each reader's outstanding queries.
+
+        Returns:
+            dict: reads, writes and the outstanding count per reader.
+        """
+        return {
+            "reads": self._reads,
+            "writes": self._writes,
+            "outstanding": list(self._outstanding),
+        }
+
+    async def close(self):
+        """
+        Close the reader and writer connections.
+        """
+        readers, self._readers = self._readers or [], None
+        writer, self._writer = self._writer, None
+        for conn in readers:
+            await conn.close()
+        if writer is not None:
+            await writer.close()
+
+    async def __aenter__(self):
+        """
+        Return the router; connections are still opened on first use.
+
+        Returns:
+            QueryRouter: The router itself.
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Close the reader and writer connections.
+
+        Args:
+            exc_type: The type of the exception (if any).
+            exc_value: The exception instance (if any).
+            traceback: The traceback (if any).
+        """
+        await self.close()
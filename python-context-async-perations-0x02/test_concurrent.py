@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the async streaming fetchers in 3-concurrent.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from async_pool import AsyncConnectionPool
+
+concurrent = __import__('3-concurrent')
+
+
+class TestAsyncStreamUsers(unittest.TestCase):
+    """
+    Test class for async_stream_users over a private pool
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a database with 100 users
+        """
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        setup = sqlite3.connect(self.path)
+        setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, "
+                      "email TEXT, age INTEGER)")
+        setup.executemany(
+            "INSERT INTO users VALUES (?, ?, ?, ?)",
+            ((i, f"User {i}", f"user{i}@example.com", 18 + i % 80)
+             for i in range(100)))
+        setup.commit()
+        setup.close()
+
+    def tearDown(self) -> None:
+        """
+        Remove the database
+        """
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_streams_every_row(self) -> None:
+        """
+        Test that the chunks add up to the whole table
+        """
+        async def scenario():
+            async with AsyncConnectionPool(self.path, size=1) as pool:
+                return [len(chunk) async for chunk in
+                        concurrent.async_stream_users(30, pool=pool)]
+
+        self.assertEqual(asyncio.run(scenario()), [30, 30, 30, 10])
+
+    def test_early_close_releases_connection(self) -> None:
+        """
+        Test that breaking out of a stream returns its connection to the pool
+        """
+        async def scenario():
+            async with AsyncConnectionPool(self.path, size=1) as pool:
+                conn = await pool.acquire()
+                await pool.release(conn)
+                stream = concurrent.async_stream_users(10, pool=pool)
+                async for _ in stream:
+                    break
+                await stream.aclose()
+                return pool._idle == [conn]
+
+        self.assertTrue(asyncio.run(scenario()))
+
+
+if __name__ == "__main__":
+    unittest.main()
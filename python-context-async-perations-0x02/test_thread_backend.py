@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the queue metrics of thread_backend.ThreadPoolBackend
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from thread_backend import ThreadPoolBackend
+
+
+class TestQueueDepth(unittest.TestCase):
+    """
+    Test class for queue_depth when jobs are cancelled
+    """
+
+    def setUp(self) -> None:
+        """
+        Create an empty database and a one-worker backend over it
+        """
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.backend = ThreadPoolBackend(self.path, max_workers=1)
+
+    def tearDown(self) -> None:
+        """
+        Stop the backend and remove the database
+        """
+        self.backend.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_cancelled_queued_job_leaves_queue(self) -> None:
+        """
+        Test that a job cancelled before it starts is not counted as queued
+        """
+        release = threading.Event()
+
+        async def scenario():
+            busy = asyncio.ensure_future(
+                self.backend.run(lambda conn: release.wait(5)))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self.backend.run(lambda conn: None), 0.05)
+            release.set()
+            await busy
+            return self.backend.stats()
+
+        stats = asyncio.run(scenario())
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["completed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
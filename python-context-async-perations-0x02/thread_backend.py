@@ -0,0 +1,383 @@
+import time
+import queue
+import sqlite3
+import asyncio
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+from connection_pool import TUNING_PROFILE
+
+DatabaseConnection = __import__('0-databaseconnection').DatabaseConnection
+ExecuteQuery = __import__('1-execute').ExecuteQuery
+
+# Latency samples kept for the percentile in stats()
+LATENCY_SAMPLES = 1000
+
+
+def _resolve(future, result, error):
+    """
+    Complete an asyncio future from the loop thread unless it was cancelled.
+    """
+    if future.cancelled():
+        return
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+
+
+def _fetchall(conn, query, params):
+    """
+    Run a query on a connection and return all rows.
+    """
+    cursor = conn.execute(query, params)
+    try:
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ThreadPoolBackend:
+    """
+    Runs the synchronous ExecuteQuery and DatabaseConnection context
+    managers on a bounded thread pool, so asyncio code can use them without
+    blocking the event loop.
+
+    Every worker thread opens one connection when it starts and keeps it
+    for its lifetime. Jobs wait in the executor queue when all workers are
+    busy; stats() reports that queue depth and per-job latency.
+
+    Usage:
+        backend = ThreadPoolBackend('users.db', max_workers=4)
+        async with backend.execute_query("SELECT * FROM users") as rows:
+            ...
+        async with backend.connection() as conn:
+            await conn.execute("UPDATE users SET age = ? WHERE id = ?", (30, 1))
+        backend.close()
+    """
+    def __init__(self, db_name='users.db', max_workers=4, pragmas=None):
+        """
+        Initialize the backend and its thread pool.
+
+        Args:
+            db_name (str): The name of the SQLite database file (default: 'users.db').
+            max_workers (int): Number of worker threads and connections (default: 4).
+            pragmas (dict): PRAGMA name to value mapping applied to each
+                worker's connection (default: TUNING_PROFILE).
+        """
+        self.db_name = db_name
+        self.max_workers = max_workers
+        self.pragmas = TUNING_PROFILE if pragmas is None else pragmas
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "max_queue_depth": 0,
+        }
+        self._waits = collections.deque(maxlen=LATENCY_SAMPLES)
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="sqlite-worker",
+            initializer=self._open_connection)
+
+    def _open_connection(self):
+        """
+        Open the calling worker thread's connection and apply the PRAGMAs.
+        """
+        # close() runs on another thread, hence check_same_thread=False
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+
+    def _dequeue(self, job):
+        """
+        Take a job off the queue depth once, whether it started or was
+        cancelled while still queued.
+        """
+        with self._lock:
+            if not job["dequeued"]:
+                job["dequeued"] = True
+                self._queued -= 1
+
+    def _call(self, func, submitted, args, job):
+        """
+        Run func with the worker's connection and record its timings.
+        """
+        started = time.perf_counter()
+        self._dequeue(job)
+        failed = True
+        try:
+            result = func(self._local.conn, *args)
+            failed = False
+            return result
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._metrics["failed" if failed else "completed"] += 1
+                self._waits.append(started - submitted)
+                self._latencies.append(finished - submitted)
+
+    async def run(self, func, *args):
+        """
+        Run func(conn, *args) on a worker thread and await its result.
+
+        Args:
+            func (callable): Called with the worker's sqlite3 connection
+                followed by args.
+            *args: Extra arguments for func.
+
+        Returns:
+            The value func returned.
+        """
+        loop = asyncio.get_running_loop()
+        job = {"dequeued": False}
+        with self._lock:
+            self._queued += 1
+            self._metrics["submitted"] += 1
+            self._metrics["max_queue_depth"] = max(
+                self._metrics["max_queue_depth"], self._queued)
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._call, func, time.perf_counter(), args, job)
+        finally:
+            # A job cancelled before a worker picked it up never reaches _call
+            self._dequeue(job)
+
+    def execute_query(self, query, params=(), row_factory="tuple"):
+        """
+        Return an async context manager running ExecuteQuery on a worker.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (tuple): Parameters for the query (default: empty tuple).
+            row_factory (str): "tuple", "namedtuple" or "slots" (default: "tuple").
+
+        Returns:
+            AsyncExecuteQuery: Yields the list of result rows.
+        """
+        return AsyncExecuteQuery(self, query, params, row_factory)
+
+    def connection(self):
+        """
+        Return an async context manager wrapping DatabaseConnection.
+
+        Returns:
+            AsyncDatabaseConnection: Holds one worker for the whole block.
+        """
+        return AsyncDatabaseConnection(self)
+
+    def stats(self):
+        """
+        Return queue-depth and latency metrics.
+
+        Returns:
+            dict: Current and maximum queue depth, job counters, and the
+            mean queue wait plus mean and p99 total latency in milliseconds
+            over the last LATENCY_SAMPLES jobs.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            queue_depth = self._queued
+            waits = list(self._waits)
+            latencies = sorted(self._latencies)
+        stats = {"workers": self.max_workers, "queue_depth": queue_depth}
+        stats.update(metrics)
+        stats["avg_wait_ms"] = sum(waits) * 1000 / len(waits) if waits else 0.0
+        stats["avg_latency_ms"] = (sum(latencies) * 1000 / len(latencies)
+                                   if latencies else 0.0)
+        stats["p99_latency_ms"] = (
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            if latencies else 0.0)
+        return stats
+
+    def close(self):
+        """
+        Wait for queued jobs, stop the workers and close their connections.
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+
+class AsyncExecuteQuery:
+    """
+    Async counterpart of ExecuteQuery that runs on a ThreadPoolBackend worker.
+    """
+    def __init__(self, backend, query, params=(), row_factory="tuple"):
+        """
+        Initialize the context manager.
+
+        Args:
+            backend (ThreadPoolBackend): Backend whose workers run the query.
+            query (str): The SQL query to execute.
+            params (tuple): Parameters for the query (default: empty tuple).
+            row_factory (str): "tuple", "namedtuple" or "slots" (default: "tuple").
+        """
+        self.backend = backend
+        self.query = query
+        self.params = params
+        self.row_factory = row_factory
+
+    def _execute(self, conn):
+        """
+        Run ExecuteQuery on the worker's connection and return its rows.
+        """
+        try:
+            with ExecuteQuery(self.backend.db_name, self.query, self.params,
+                              row_factory=self.row_factory, conn=conn) as rows:
+                return rows
+        finally:
+            # ExecuteQuery never commits; a fresh connection would drop
+            # uncommitted work on close, so a reused one must too
+            if conn.in_transaction:
+                conn.rollback()
+
+    async def __aenter__(self):
+        """
+        Execute the query on a worker and return the results.
+
+        Returns:
+            list: The query results.
+        """
+        return await self.backend.run(self._execute)
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Nothing to release; the worker already closed the cursor.
+
+        Args:
+            exc_type: The type of the exception (if any).
+            exc_value: The exception instance (if any).
+            traceback: The traceback (if any).
+        """
+
+
+class AsyncDatabaseConnection:
+    """
+    Async counterpart of DatabaseConnection that runs on a ThreadPoolBackend
+    worker.
+
+    The block holds one worker, so every statement runs on the same
+    connection and transaction; on exit DatabaseConnection commits, or
+    rolls back if the block raised. Blocks waiting on the same backend
+    must not be nested more than max_workers deep.
+    """
+    _EXIT = object()
+
+    def __init__(self, backend):
+        """
+        Initialize the context manager.
+
+        Args:
+            backend (ThreadPoolBackend): Backend whose worker runs the block.
+        """
+        self.backend = backend
+        self._loop = None
+        self._requests = None
+        self._session = None
+
+    def _serve(self, conn, ready):
+        """
+        Enter DatabaseConnection on the worker and run requests until exit.
+        """
+        manager = DatabaseConnection(self.backend.db_name, conn=conn)
+        manager.__enter__()
+        self._loop.call_soon_threadsafe(_resolve, ready, None, None)
+        while True:
+            func, args, future = self._requests.get()
+            if func is self._EXIT:
+                manager.__exit__(args, None, None)
+                return
+            try:
+                result, error = func(conn, *args), None
+            except Exception as e:
+                result, error = None, e
+            self._loop.call_soon_threadsafe(_resolve, future, result, error)
+
+    async def __aenter__(self):
+        """
+        Start a session on a worker once one is free.
+
+        Returns:
+            AsyncDatabaseConnection: Proxy running statements on the worker.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._requests = queue.SimpleQueue()
+        ready = self._loop.create_future()
+        self._session = asyncio.ensure_future(self.backend.run(self._serve, ready))
+        try:
+            await asyncio.wait({ready, self._session},
+                               return_when=asyncio.FIRST_COMPLETED)
+        except BaseException as e:
+            # The worker still starts the session; make it roll back and stop
+            self._requests.put((self._EXIT, type(e), None))
+            raise
+        if not ready.done():
+            ready.cancel()
+            self._session.result()
+        return self
+
+    async def call(self, func, *args):
+        """
+        Run func(conn, *args) on the session's worker and await its result.
+
+        Args:
+            func (callable): Called with the sqlite3 connection followed by args.
+            *args: Extra arguments for func.
+
+        Returns:
+            The value func returned.
+        """
+        future = self._loop.create_future()
+        self._requests.put((func, args, future))
+        return await future
+
+    async def execute(self, query, params=()):
+        """
+        Execute a query in the session and return all rows.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (tuple): Parameters for the query (default: empty tuple).
+
+        Returns:
+            list: The query results as a list of tuples.
+        """
+        return await self.call(_fetchall, query, params)
+
+    async def executemany(self, query, seq_of_params):
+        """
+        Execute a statement once per parameter tuple in the session.
+
+        Args:
+            query (str): The SQL statement to execute.
+            seq_of_params (iterable): Parameter tuples.
+
+        Returns:
+            int: The number of rows modified.
+        """
+        def run(conn, seq_of_params):
+            return conn.executemany(query, seq_of_params).rowcount
+        return await self.call(run, list(seq_of_params))
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Commit (or roll back if the block raised) and free the worker.
+
+        Args:
+            exc_type: The type of the exception (if any).
+            exc_value: The exception instance (if any).
+            traceback: The traceback (if any).
+        """
+        self._requests.put((self._EXIT, exc_type, None))
+        await self._session
@@ -1,25 +1,97 @@
 import sqlite3
+import atexit
+import inspect
 import functools
 import logging
+import time
 from datetime import datetime  # Added import
 
+from query_profiler import QueryProfiler
+from query_tracer import count_rows, split_query, trace_queries
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')  # Removed asctime to use custom datetime
+logger = logging.getLogger(__name__)
+
+# Set by enable_profiling; when None, log_queries does not time calls
+profiler = None
+
+def enable_profiling(report_at_exit=True, top=10, explain=0, database='users.db'):
+    """
+    Turns on profiling mode: every log_queries call is timed and aggregated
+    by query fingerprint in a QueryProfiler.
+    
+    Args:
+        report_at_exit: Print the top-N report when the interpreter exits.
+        top: Number of fingerprints in the exit report.
+        explain: Number of slowest fingerprints to EXPLAIN QUERY PLAN in the
+            exit report.
+        database: Database used for EXPLAIN QUERY PLAN.
+    
+    Returns:
+        The active QueryProfiler; call its report() method on demand.
+    """
+    global profiler
+    if profiler is None:
+        profiler = QueryProfiler()
+        if report_at_exit:
+            atexit.register(
+                lambda: print(profiler.report(top, explain, database))
+            )
+    return profiler
 
 def log_queries(func):
     """
     A decorator that logs the SQL query with a custom timestamp before executing the decorated function.
+    
+    Nothing is formatted when INFO logging is disabled. After enable_profiling()
+    calls are also timed and aggregated per query fingerprint; for coroutine
+    functions the timing covers the awaited query. See
+    query_tracer.trace_queries for structured traces.
     """
+    def log(args, kwargs):
+        """
+        Logs the query if INFO logging is enabled.
+        """
+        if logger.isEnabledFor(logging.INFO):
+            query = split_query(args, kwargs)[0] or "No query provided"
+            # Use datetime for custom timestamp
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            logger.info("%s - Executing query: %s", timestamp, query)
+
+    def profile(args, kwargs, duration, result):
+        """
+        Records the call in the active profiler.
+        """
+        query, (params, _) = split_query(args, kwargs)
+        if query is not None:
+            profiler.record(query, tuple(params), duration, count_rows(result))
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            log(args, kwargs)
+            if profiler is None:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            result = await func(*args, **kwargs)
+            profile(args, kwargs, time.perf_counter() - start, result)
+            return result
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        query = args[0] if args else "No query provided"
-        # Use datetime for custom timestamp
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        logging.info(f"{timestamp} - Executing query: {query}")
-        return func(*args, **kwargs)
+        log(args, kwargs)
+        if profiler is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        profile(args, kwargs, time.perf_counter() - start, result)
+        return result
     return wrapper
 
 @log_queries
+@trace_queries
 def fetch_all_users(query):
     """
     Fetches all users from the database using the provided SQL query.
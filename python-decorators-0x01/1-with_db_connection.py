@@ -1,28 +1,8 @@
-import sqlite3
-import functools
+from db_connection import cached_cursor, with_db_connection
 
-def with_db_connection(func):
-    """
-    A decorator that handles opening and closing SQLite database connections.
-    
-    Args:
-        func: The function to be decorated (e.g., get_user_by_id).
-    
-    Returns:
-        wrapper: A function that manages the connection and calls the original function.
-    """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        # Open a connection to the database
-        conn = sqlite3.connect('users.db')
-        try:
-            # Call the original function, passing the connection as the first argument
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            # Ensure the connection is closed, even if an error occurs
-            conn.close()
-    return wrapper
+# Placeholder counts used for bulk lookups; padding each chunk to one of these
+# keeps the number of distinct prepared statements small
+BULK_WIDTHS = (1, 8, 64, 256)
 
 @with_db_connection
 def get_user_by_id(conn, user_id):
@@ -36,10 +16,42 @@ def get_user_by_id(conn, user_id):
     Returns:
         A tuple containing the user data, or None if not found.
     """
-    cursor = conn.cursor()
+    cursor = cached_cursor(conn)
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
     return cursor.fetchone()
 
+@with_db_connection
+def get_users_by_ids(conn, user_ids):
+    """
+    Fetches many users by ID with a few IN queries instead of one query per ID.
+    
+    SQLite's executemany only accepts DML, so lookups are chunked into IN lists
+    padded to one of BULK_WIDTHS placeholders, which stay prepared in the
+    connection's statement cache.
+    
+    Args:
+        conn: SQLite database connection.
+        user_ids: The IDs of the users to fetch.
+    
+    Returns:
+        A list with the user tuple, or None if not found, for each ID in order.
+    """
+    user_ids = list(user_ids)
+    found = {}
+    cursor = cached_cursor(conn)
+    start = 0
+    while start < len(user_ids):
+        remaining = len(user_ids) - start
+        width = next((w for w in BULK_WIDTHS if w >= remaining), BULK_WIDTHS[-1])
+        chunk = user_ids[start:start + width]
+        chunk += [chunk[-1]] * (width - len(chunk))
+        placeholders = ", ".join("?" * width)
+        cursor.execute(f"SELECT * FROM users WHERE id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            found[row[0]] = row
+        start += width
+    return [found.get(user_id) for user_id in user_ids]
+
 # Example usage
 if __name__ == "__main__":
     user = get_user_by_id(user_id=1)
@@ -1,48 +1,271 @@
+import time
 import sqlite3
+import inspect
 import functools
+import threading
+import contextlib
 
-def with_db_connection(func):
+from db_connection import get_pool, with_db_connection
+from query_cache import invalidate_tables, written_tables
+
+# The TransactionBatch active in the current thread, if any
+_local = threading.local()
+
+class TransactionBatch:
     """
-    A decorator that handles opening and closing SQLite database connections.
+    Groups many writes on one connection into a single transaction.
     
-    Args:
-        func: The function to be decorated.
+    Decorated transactional calls made on the batch's connection run inside
+    their own SAVEPOINT, so a failing call only rolls back its own changes.
+    Statements queued with add() are sent with executemany while consecutive
+    statements share the same SQL; if one row fails, the group is replayed
+    row by row so only the failing rows are skipped. The transaction commits
+    once max_rows rows have changed or max_seconds have passed, and again
+    when the batch exits.
     
-    Returns:
-        wrapper: A function that manages the connection and calls the original function.
+    Batches on different connections may be nested; the outer batch becomes
+    active again when the inner one exits. To nest on the same connection,
+    use batched_transaction, which joins the outer batch.
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
+    def __init__(self, conn, max_rows=1000, max_seconds=1.0):
+        """
+        Initialize the batch.
+        
+        Args:
+            conn: SQLite database connection.
+            max_rows: Changed rows that trigger a commit (default: 1000).
+            max_seconds: Age of the open transaction that triggers a commit
+                (default: 1.0).
+        """
+        self.conn = conn
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.failures = []
+        self.commits = 0
+        self._pending_sql = None
+        self._pending_params = []
+        self._statements = []
+        self._outer = None
+
+    def __enter__(self):
+        """
+        Starts the transaction and makes the batch active in this thread.
+        
+        Raises:
+            RuntimeError: If a batch on the same connection is already active.
+        """
+        outer = getattr(_local, "batch", None)
+        if outer is not None and outer.conn is self.conn:
+            raise RuntimeError("A TransactionBatch is already active on this "
+                               "connection; use batched_transaction to join it")
+        self.conn.set_trace_callback(self._statements.append)
+        self._begin()
+        self._outer, _local.batch = outer, self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Commits the remaining work, or rolls it back if the block raised.
+        
+        Either way cached results for the written tables are evicted: reads
+        made on the batch's connection may have cached uncommitted rows.
+        """
+        _local.batch, self._outer = self._outer, None
         try:
-            result = func(conn, *args, **kwargs)
-            return result
+            if exc_type is None:
+                self._flush()
+                self.conn.commit()
+                self.commits += 1
+                self._invalidate()
+            else:
+                self._pending_params = []
+                self.conn.rollback()
+                self._invalidate()
         finally:
-            conn.close()
-    return wrapper
+            self.conn.set_trace_callback(None)
+
+    def _begin(self):
+        """
+        Opens a transaction so savepoints nest inside it.
+        """
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self._started = time.monotonic()
+        self._changes = self.conn.total_changes
+
+    def _invalidate(self, clear=True):
+        """
+        Evicts cached results for the tables written since the last commit.
+        
+        Args:
+            clear: Forget the statements afterwards; False keeps them so the
+                next commit invalidates their tables again (default: True).
+        """
+        invalidate_tables(written_tables(self._statements))
+        if clear:
+            self._statements.clear()
+
+    def call(self, func, args, kwargs):
+        """
+        Runs one decorated call inside a savepoint.
+        
+        Returns:
+            The result of the call; its exception is re-raised after its
+            changes are rolled back.
+        """
+        self._flush()
+        self.conn.execute("SAVEPOINT batch_item")
+        try:
+            result = func(self.conn, *args, **kwargs)
+        except Exception as e:
+            self.conn.execute("ROLLBACK TO batch_item")
+            self.conn.execute("RELEASE batch_item")
+            # Reads inside the failed call may have cached its undone writes
+            self._invalidate(clear=False)
+            self.failures.append((func.__name__, args, e))
+            raise e
+        self.conn.execute("RELEASE batch_item")
+        self._maybe_commit()
+        return result
+
+    def add(self, sql, params):
+        """
+        Queues a write statement for executemany.
+        
+        Args:
+            sql: The SQL statement.
+            params: Parameters for one execution.
+        """
+        if sql != self._pending_sql:
+            self._flush()
+            self._pending_sql = sql
+        self._pending_params.append(params)
+        if len(self._pending_params) >= self.max_rows:
+            self._flush()
+        self._maybe_commit()
+
+    def _flush(self):
+        """
+        Sends queued statements, isolating failing rows with savepoints.
+        """
+        if not self._pending_params:
+            return
+        sql, rows = self._pending_sql, self._pending_params
+        self._pending_params = []
+        self.conn.execute("SAVEPOINT batch_many")
+        try:
+            self.conn.executemany(sql, rows)
+            self.conn.execute("RELEASE batch_many")
+            return
+        except sqlite3.Error:
+            self.conn.execute("ROLLBACK TO batch_many")
+            self.conn.execute("RELEASE batch_many")
+        for params in rows:
+            self.conn.execute("SAVEPOINT batch_item")
+            try:
+                self.conn.execute(sql, params)
+            except sqlite3.Error as e:
+                self.conn.execute("ROLLBACK TO batch_item")
+                self.failures.append((sql, params, e))
+            self.conn.execute("RELEASE batch_item")
+
+    def _maybe_commit(self):
+        """
+        Commits when the row-count or time threshold is reached.
+        """
+        rows = self.conn.total_changes - self._changes + len(self._pending_params)
+        if rows >= self.max_rows or time.monotonic() - self._started >= self.max_seconds:
+            self.commit()
+
+    def commit(self):
+        """
+        Commits everything so far and starts a new transaction.
+        """
+        self._flush()
+        self.conn.commit()
+        self.commits += 1
+        self._invalidate()
+        self._begin()
+
+@contextlib.contextmanager
+def batched_transaction(max_rows=1000, max_seconds=1.0, pool=None):
+    """
+    Runs every transactional call in the block as part of one TransactionBatch.
+    
+    A pooled connection is pinned to the current thread for the block, so
+    with_db_connection hands the same connection to each decorated call.
+    Nested inside another batched_transaction on the same pool, the block
+    joins the outer batch, which commits when the outermost block exits.
+    
+    Args:
+        max_rows: Changed rows that trigger a commit (default: 1000).
+        max_seconds: Age of the open transaction that triggers a commit (default: 1.0).
+        pool: ConnectionPool to borrow from (default: the shared pool).
+    
+    Yields:
+        TransactionBatch: The active batch.
+    """
+    with (pool or get_pool()).pinned() as conn:
+        outer = getattr(_local, "batch", None)
+        if outer is not None and outer.conn is conn:
+            yield outer
+            return
+        with TransactionBatch(conn, max_rows, max_seconds) as batch:
+            yield batch
 
 def transactional(func):
     """
     A decorator that manages database transactions, committing on success or rolling back on failure.
     
+    Statements executed during the transaction are traced, and after a commit
+    cached query results that read the modified tables are invalidated. Inside
+    batched_transaction the call joins the batch's transaction instead, within
+    its own savepoint. Coroutine functions get the same behaviour on an
+    aiosqlite connection.
+    
     Args:
         func: The function to be decorated (e.g., update_user_email).
     
     Returns:
         wrapper: A function that wraps the operation in a transaction.
     """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(conn, *args, **kwargs):
+            statements = []
+            await conn.set_trace_callback(statements.append)
+            try:
+                result = await func(conn, *args, **kwargs)
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                raise e
+            finally:
+                await conn.set_trace_callback(None)
+            invalidate_tables(written_tables(statements))
+            return result
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
+        batch = getattr(_local, "batch", None)
+        if batch is not None and batch.conn is conn:
+            return batch.call(func, args, kwargs)
+        statements = []
+        conn.set_trace_callback(statements.append)
         try:
             # Execute the function within a transaction
             result = func(conn, *args, **kwargs)
             # Commit the transaction if no errors occur
             conn.commit()
-            return result
         except Exception as e:
             # Roll back the transaction if an error occurs
             conn.rollback()
             raise e  # Re-raise the exception to maintain error visibility
+        finally:
+            conn.set_trace_callback(None)
+        invalidate_tables(written_tables(statements))
+        return result
     return wrapper
 
 @with_db_connection
@@ -62,6 +285,24 @@ def update_user_email(conn, user_id, new_email):
     cursor = conn.cursor()
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
 
+@with_db_connection
+@transactional
+def update_user_emails(conn, updates):
+    """
+    Updates many users' emails with a single executemany.
+    
+    Args:
+        conn: SQLite database connection.
+        updates: Iterable of (user_id, new_email) pairs.
+    
+    Returns:
+        None
+    """
+    conn.executemany(
+        "UPDATE users SET email = ? WHERE id = ?",
+        ((new_email, user_id) for user_id, new_email in updates)
+    )
+
 # Example usage
 if __name__ == "__main__":
     try:
@@ -1,51 +1,229 @@
 import time
+import random
 import sqlite3
+import asyncio
+import inspect
 import functools
+import threading
 
-def with_db_connection(func):
+from db_connection import with_db_connection
+
+# Substrings of sqlite3.OperationalError messages worth retrying
+TRANSIENT_ERRORS = (
+    "database is locked",
+    "database table is locked",
+    "database schema has changed",
+)
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a function whose circuit breaker is open.
+    """
+
+class CircuitBreaker:
+    """
+    Stops calling a function after repeated transient failures.
+    
+    After failure_threshold consecutive calls have exhausted their retries on
+    transient errors, the circuit opens and new calls fail fast with
+    CircuitOpenError. Once reset_timeout seconds have passed a single trial
+    call is let through; its success closes the circuit and its failure opens
+    it again.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Initialize a closed circuit.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (default: 5).
+            reset_timeout: Seconds before a trial call is allowed (default: 30).
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError unless a call may go ahead.
+        
+        Returns:
+            True if the call is the half-open trial, False otherwise.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if self._trial_running or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("Circuit open, not calling the database")
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        """
+        Closes the circuit.
+        """
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self, trial=False):
+        """
+        Counts a failed call, opening the circuit at the threshold.
+        
+        Args:
+            trial: Whether the call was the trial returned by before_call.
+        """
+        with self._lock:
+            self.failures += 1
+            if trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            if trial:
+                self._trial_running = False
+
+    def abandon_call(self):
+        """
+        Releases the trial call when it ended without an outcome, for example
+        because it was cancelled or interrupted, so a later call may try.
+        """
+        with self._lock:
+            self._trial_running = False
+
+def is_transient(error):
     """
-    A decorator that handles opening and closing SQLite database connections.
+    Returns True for errors that may succeed on retry, such as a locked database.
     
     Args:
-        func: The function to be decorated.
+        error: The exception raised by the decorated function.
+    """
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return any(transient in message for transient in TRANSIENT_ERRORS)
+
+def backoff_delay(attempt, delay, max_delay):
+    """
+    Exponential backoff with full jitter.
+    
+    Args:
+        attempt: Number of the attempt that just failed, starting at 1.
+        delay: Base delay in seconds.
+        max_delay: Upper bound of the backoff window in seconds.
     
     Returns:
-        wrapper: A function that manages the connection and calls the original function.
+        A random delay between 0 and min(max_delay, delay * 2 ** (attempt - 1)).
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            conn.close()
-    return wrapper
-
-def retry_on_failure(retries=3, delay=2):
+    return random.uniform(0, min(max_delay, delay * 2 ** (attempt - 1)))
+
+def retry_on_failure(retries=3, delay=2, max_delay=30, deadline=None,
+                     retry_if=is_transient, breaker=None):
     """
-    A decorator that retries a function on failure up to a specified number of times.
+    A decorator that retries a function on transient failures up to a specified
+    number of times.
+    
+    Sleeps are randomized with exponential backoff and full jitter so that
+    contending workers do not retry in lockstep. Errors rejected by retry_if
+    (programming errors, constraint violations, ...) are raised immediately.
+    Coroutine functions are retried with asyncio.sleep instead of time.sleep.
     
     Args:
-        retries: Number of retry attempts (default: 3).
-        delay: Delay in seconds between retries (default: 2).
+        retries: Total number of attempts (default: 3).
+        delay: Base delay in seconds for the backoff (default: 2).
+        max_delay: Maximum delay in seconds between attempts (default: 30).
+        deadline: Overall time budget in seconds across all attempts, or None.
+        retry_if: Predicate deciding whether an exception is retried
+            (default: is_transient).
+        breaker: CircuitBreaker shared by every call of the function
+            (default: a new CircuitBreaker per decorated function).
     
     Returns:
-        wrapper: A function that retries the original function on exceptions.
+        wrapper: A function that retries the original function on transient errors.
     """
     def decorator(func):
+        circuit = breaker or CircuitBreaker()
+
+        def next_delay(attempt, error, started):
+            """
+            Returns how long to sleep before retrying, or None to give up.
+            """
+            if attempt >= retries or not retry_if(error):
+                return None
+            pause = backoff_delay(attempt, delay, max_delay)
+            if deadline is not None and time.monotonic() - started + pause > deadline:
+                return None
+            print(f"Attempt {attempt} failed with error: {error}. Retrying in {pause:.2f} seconds...")
+            return pause
+
+        def record_outcome(error, trial):
+            """
+            Reports a call that gave up to the circuit breaker.
+            """
+            if retry_if(error):
+                circuit.record_failure(trial)
+            else:
+                circuit.record_success()  # The database did respond
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                trial = circuit.before_call()
+                recorded = False
+                started = time.monotonic()
+                attempt = 1
+                try:
+                    while True:
+                        try:
+                            result = await func(*args, **kwargs)
+                        except Exception as e:
+                            pause = next_delay(attempt, e, started)
+                            if pause is None:
+                                recorded = True
+                                record_outcome(e, trial)
+                                raise e
+                            await asyncio.sleep(pause)
+                            attempt += 1
+                        else:
+                            recorded = True
+                            circuit.record_success()
+                            return result
+                except BaseException:
+                    # Cancelled (e.g. by asyncio.wait_for) before an outcome
+                    if trial and not recorded:
+                        circuit.abandon_call()
+                    raise
+            async_wrapper.circuit_breaker = circuit
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            trial = circuit.before_call()
+            recorded = False
+            started = time.monotonic()
             attempt = 1
-            while attempt <= retries:
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == retries:
-                        raise e  # Re-raise the exception on the final attempt
-                    print(f"Attempt {attempt} failed with error: {e}. Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                    attempt += 1
+            try:
+                while True:
+                    try:
+                        result = func(*args, **kwargs)
+                    except Exception as e:
+                        pause = next_delay(attempt, e, started)
+                        if pause is None:
+                            recorded = True
+                            record_outcome(e, trial)
+                            raise e  # Re-raise the exception on the final attempt
+                        time.sleep(pause)
+                        attempt += 1
+                    else:
+                        recorded = True
+                        circuit.record_success()
+                        return result
+            except BaseException:
+                # Interrupted (e.g. KeyboardInterrupt) before an outcome
+                if trial and not recorded:
+                    circuit.abandon_call()
+                raise
+        wrapper.circuit_breaker = circuit
         return wrapper
     return decorator
 
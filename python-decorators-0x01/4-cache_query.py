@@ -1,32 +1,21 @@
 import time
-import sqlite3
+import inspect
 import functools
 
-query_cache = {}
+from db_connection import with_db_connection
+from query_cache import QueryCache, make_key, tables_in
 
-def with_db_connection(func):
-    """
-    A decorator that handles opening and closing SQLite database connections.
-    
-    Args:
-        func: The function to be decorated.
-    
-    Returns:
-        wrapper: A function that manages the connection and calls the original function.
-    """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db')
-        try:
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            conn.close()
-    return wrapper
+query_cache = QueryCache()
 
 def cache_query(func):
     """
-    A decorator that caches database query results based on the SQL query string.
+    A decorator that caches database query results based on the SQL query string
+    and its bound parameters.
+    
+    Results are stored in the bounded query_cache, tagged with the tables the
+    query reads so writes made through transactional functions evict them.
+    Concurrent callers missing on the same query wait for a single execution;
+    for coroutine functions they await it without blocking the event loop.
     
     Args:
         func: The function to be decorated (e.g., fetch_users_with_cache).
@@ -34,16 +23,37 @@ def cache_query(func):
     Returns:
         wrapper: A function that checks the cache before executing the query.
     """
+    def report(source, query):
+        """
+        Prints whether the result came from the cache.
+        """
+        if source == "loaded":
+            print(f"Caching result for query: {query}")
+        else:
+            print(f"Returning cached result for query: {query}")
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(conn, query, *args, **kwargs):
+            source, result = await query_cache.aget_or_load(
+                make_key(query, args, kwargs),
+                lambda: func(conn, query, *args, **kwargs),
+                tables=tables_in(query)
+            )
+            report(source, query)
+            return result
+        return async_wrapper
+
     @functools.wraps(func)
     def wrapper(conn, query, *args, **kwargs):
-        # Check if the query result is in the cache
-        if query in query_cache:
-            print(f"Returning cached result for query: {query}")
-            return query_cache[query]
-        # Execute the query and cache the result
-        result = func(conn, query, *args, **kwargs)
-        query_cache[query] = result
-        print(f"Caching result for query: {query}")
+        key = make_key(query, args, kwargs)
+        # Return the cached result, or execute the query once and cache it
+        source, result = query_cache.get_or_load(
+            key,
+            lambda: func(conn, query, *args, **kwargs),
+            tables=tables_in(query)
+        )
+        report(source, query)
         return result
     return wrapper
 
@@ -74,5 +84,6 @@ if __name__ == "__main__":
         # Second call: Uses cached result
         users_again = fetch_users_with_cache(query="SELECT * FROM users")
         print("Second call result:", users_again)
+        print("Cache statistics:", query_cache.stats())
     except Exception as e:
         print(f"Error executing query: {e}")
\ No newline at end of file
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+cache_module = __import__('4-cache_query')
+
+executions = 0
+executions_lock = threading.Lock()
+
+
+@cache_module.with_db_connection
+@cache_module.cache_query
+def fetch_hot_query(conn, query):
+    """
+    Runs the query, counting how many times the database is actually hit.
+    
+    Args:
+        conn: SQLite database connection.
+        query: The SQL query to execute.
+    
+    Returns:
+        List of tuples containing the query results.
+    """
+    global executions
+    with executions_lock:
+        executions += 1
+    cursor = conn.cursor()
+    cursor.execute(query)
+    time.sleep(0.05)  # Simulate a slow query so callers overlap
+    return cursor.fetchall()
+
+
+def unsynchronized(conn, query):
+    """
+    The previous check-then-set behaviour, for comparison.
+    """
+    global executions
+    key = (query,)
+    hit, result = cache_module.query_cache.get(key)
+    if hit:
+        return result
+    with executions_lock:
+        executions += 1
+    cursor = conn.cursor()
+    cursor.execute(query)
+    time.sleep(0.05)
+    result = cursor.fetchall()
+    cache_module.query_cache.set(key, result)
+    return result
+
+
+def load_test(call, callers):
+    """
+    Calls the function from many threads at once on a cold cache.
+    
+    Returns:
+        Tuple of (database executions, elapsed seconds).
+    """
+    global executions
+    executions = 0
+    cache_module.query_cache.clear()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=callers) as pool:
+            futures = [pool.submit(call) for _ in range(callers)]
+            for future in futures:
+                future.result()
+    return executions, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    query = "SELECT * FROM users"
+    without_coalescing = cache_module.with_db_connection(unsynchronized)
+    for label, call in (
+        ("check-then-set", lambda: without_coalescing(query)),
+        ("single-flight", lambda: fetch_hot_query(query=query)),
+    ):
+        count, elapsed = load_test(call, callers)
+        print(f"{label}: {callers} callers, {count} database executions, "
+              f"{elapsed:.3f}s")
+    print("Cache statistics:", cache_module.query_cache.stats())
@@ -0,0 +1,49 @@
+import functools
+import sqlite3
+import sys
+import time
+
+from db_connection import with_db_connection
+
+
+def with_unpooled_connection(func):
+    """
+    The previous decorator: a new connection for every call, for comparison.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        conn = sqlite3.connect('users.db')
+        try:
+            return func(conn, *args, **kwargs)
+        finally:
+            conn.close()
+    return wrapper
+
+
+def get_user_by_id(conn, user_id):
+    """
+    Fetches a user from the database by their ID.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+
+def calls_per_second(lookup, calls):
+    """
+    Times calls point lookups and returns the rate.
+    """
+    start = time.perf_counter()
+    for i in range(calls):
+        lookup(user_id=i % 100 + 1)
+    return calls / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for label, decorator in (
+        ("unpooled", with_unpooled_connection),
+        ("pooled", with_db_connection),
+    ):
+        rate = calls_per_second(decorator(get_user_by_id), calls)
+        print(f"{label}: {rate:,.0f} calls/s")
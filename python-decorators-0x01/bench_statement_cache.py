@@ -0,0 +1,57 @@
+import sqlite3
+import sys
+import time
+
+from db_connection import ConnectionPool, cached_cursor, with_db_connection
+
+lookups_module = __import__('1-with_db_connection')
+
+LOOKUPS = 100000
+
+
+def new_cursor_lookup(conn, user_id):
+    """
+    Point lookup creating a new cursor per call.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+
+def cached_cursor_lookup(conn, user_id):
+    """
+    Point lookup reusing the connection's cursor.
+    """
+    cursor = cached_cursor(conn)
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+
+def run(label, lookup, user_ids):
+    """
+    Times one lookup per ID and prints the rate.
+    """
+    start = time.perf_counter()
+    for user_id in user_ids:
+        lookup(user_id=user_id)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {len(user_ids) / elapsed:,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else LOOKUPS
+    conn = sqlite3.connect('users.db')
+    max_id = conn.execute("SELECT MAX(id) FROM users").fetchone()[0]
+    conn.close()
+    user_ids = [i % max_id + 1 for i in range(lookups)]
+
+    no_statement_cache = ConnectionPool(cached_statements=0)
+    run("new cursor, no statement cache",
+        with_db_connection(new_cursor_lookup, pool=no_statement_cache), user_ids)
+    run("new cursor, statement cache", with_db_connection(new_cursor_lookup), user_ids)
+    run("cached cursor, statement cache", with_db_connection(cached_cursor_lookup), user_ids)
+
+    start = time.perf_counter()
+    lookups_module.get_users_by_ids(user_ids=user_ids)
+    elapsed = time.perf_counter() - start
+    print(f"bulk IN lookups: {lookups / elapsed:,.0f} lookups/s")
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import sys
+import time
+
+from db_connection import ConnectionPool, with_db_connection
+
+transactional_module = __import__('2-transactional')
+transactional = transactional_module.transactional
+batched_transaction = transactional_module.batched_transaction
+
+DATABASE = 'bench_users.db'
+ROWS = 100000
+
+pool = ConnectionPool(database=DATABASE)
+
+
+@with_db_connection(pool=pool)
+@transactional
+def update_user_email(conn, user_id, new_email):
+    """
+    Updates a user's email in the benchmark database.
+    """
+    conn.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
+
+def create_users():
+    """
+    Creates a fresh users table with ROWS rows.
+    """
+    if os.path.exists(DATABASE):
+        os.remove(DATABASE)
+    conn = sqlite3.connect(DATABASE)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, age INTEGER)")
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?)",
+        ((i, f"User {i}", f"user{i}@example.com", 18 + i % 80) for i in range(1, ROWS + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def updates_per_second(run, updates):
+    """
+    Times run(updates) and returns the update rate.
+    """
+    start = time.perf_counter()
+    run(updates)
+    return updates / (time.perf_counter() - start)
+
+
+def single(updates):
+    """
+    One transaction per update.
+    """
+    for i in range(updates):
+        update_user_email(user_id=i % ROWS + 1, new_email=f"single{i}@example.com")
+
+
+def batched_calls(updates):
+    """
+    Decorated calls grouped into batches, one savepoint per call.
+    """
+    with batched_transaction(max_rows=1000, pool=pool):
+        for i in range(updates):
+            update_user_email(user_id=i % ROWS + 1, new_email=f"batched{i}@example.com")
+
+
+def batched_executemany(updates):
+    """
+    Same-shape statements queued on the batch and sent with executemany.
+    """
+    with batched_transaction(max_rows=1000, pool=pool) as batch:
+        for i in range(updates):
+            batch.add("UPDATE users SET email = ? WHERE id = ?",
+                      (f"many{i}@example.com", i % ROWS + 1))
+
+
+if __name__ == "__main__":
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    create_users()
+    for label, run in (
+        ("single commits", single),
+        ("batched calls", batched_calls),
+        ("batched executemany", batched_executemany),
+    ):
+        print(f"{label}: {updates_per_second(run, updates):,.0f} updates/s")
+    pool.close_all()
@@ -0,0 +1,371 @@
+import sqlite3
+import asyncio
+import inspect
+import weakref
+import functools
+import threading
+import contextlib
+
+try:
+    import aiosqlite
+except ImportError:  # Only needed for coroutine functions
+    aiosqlite = None
+
+DEFAULT_DATABASE = 'users.db'
+
+# Prepared statements kept per connection (sqlite3's default is 128)
+CACHED_STATEMENTS = 256
+
+# Applied once to every new connection
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,  # 16 MiB page cache per connection
+}
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of SQLite connections.
+    
+    Connections are opened lazily up to size, configured once with PRAGMA
+    settings, and reused across calls. A thread gets back the connection it
+    used last whenever that connection is idle, so its page cache stays warm.
+    """
+    def __init__(self, database=DEFAULT_DATABASE, size=5, pragmas=None,
+                 timeout=30, cached_statements=CACHED_STATEMENTS):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            database: Path of the SQLite database file (default: 'users.db').
+            size: Maximum number of open connections (default: 5).
+            pragmas: PRAGMA name to value mapping applied to new connections
+                (default: DEFAULT_PRAGMAS).
+            timeout: Seconds to wait for a free connection (default: 30).
+            cached_statements: Size of each connection's prepared statement
+                cache (default: CACHED_STATEMENTS).
+        """
+        self.database = database
+        self.size = size
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+    def _connect(self):
+        """
+        Opens a new connection and applies the PRAGMA settings.
+        """
+        conn = sqlite3.connect(self.database, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self):
+        """
+        Borrows a connection, waiting if all of them are in use.
+        
+        Returns:
+            sqlite3.Connection: The borrowed connection.
+        
+        Raises:
+            TimeoutError: If no connection became free within timeout.
+        """
+        pinned = getattr(self._local, "pinned", None)
+        if pinned is not None:
+            return pinned
+        with self._condition:
+            while True:
+                preferred = getattr(self._local, "conn", None)
+                if preferred is not None and preferred in self._idle:
+                    self._idle.remove(preferred)
+                    return preferred
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    conn = None
+                    break
+                if not self._condition.wait(self.timeout):
+                    raise TimeoutError("Timed out waiting for a database connection")
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._condition:
+                    self._created -= 1
+                    self._condition.notify()
+                raise
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn):
+        """
+        Returns a connection to the pool, rolling back any open transaction.
+        
+        Args:
+            conn: A connection obtained from acquire.
+        """
+        if conn is getattr(self._local, "pinned", None):
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        with self._condition:
+            self._idle.append(conn)
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def pinned(self):
+        """
+        Pins one connection to the current thread for the duration of a block.
+        
+        Every acquire in this thread returns the pinned connection, so
+        decorated calls made inside the block share its transaction. A nested
+        block reuses the connection already pinned and leaves releasing it to
+        the outermost block.
+        
+        Yields:
+            sqlite3.Connection: The pinned connection.
+        """
+        outer = getattr(self._local, "pinned", None)
+        if outer is not None:
+            yield outer
+            return
+        conn = self.acquire()
+        self._local.pinned = conn
+        try:
+            yield conn
+        finally:
+            self._local.pinned = None
+            self.release(conn)
+
+    def close_all(self):
+        """
+        Closes every idle connection.
+        """
+        with self._condition:
+            for conn in self._idle:
+                _cursors.pop(id(conn), None)
+                conn.close()
+                self._created -= 1
+            self._idle = []
+
+
+class AsyncConnectionPool:
+    """
+    An asyncio pool of aiosqlite connections, the async counterpart of
+    ConnectionPool. It must only be used from the event loop it was first
+    used on.
+    
+    Every aiosqlite connection runs on its own non-daemon thread, so the
+    pool must be closed before the loop ends, either with close_all() or by
+    using it as an async context manager.
+    """
+    def __init__(self, database=DEFAULT_DATABASE, size=5, pragmas=None,
+                 timeout=30):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            database: Path of the SQLite database file (default: 'users.db').
+            size: Maximum number of open connections (default: 5).
+            pragmas: PRAGMA name to value mapping applied to new connections
+                (default: DEFAULT_PRAGMAS).
+            timeout: Seconds to wait for a free connection (default: 30).
+        """
+        if aiosqlite is None:
+            raise ImportError("aiosqlite is required for async database access")
+        self.database = database
+        self.size = size
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.timeout = timeout
+        self._idle = []
+        self._created = 0
+        self._condition = None
+
+    async def _connect(self):
+        """
+        Opens a new connection and applies the PRAGMA settings.
+        """
+        conn = await aiosqlite.connect(self.database)
+        for name, value in self.pragmas.items():
+            await conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    async def acquire(self):
+        """
+        Borrows a connection, waiting if all of them are in use.
+        
+        Returns:
+            aiosqlite.Connection: The borrowed connection.
+        
+        Raises:
+            TimeoutError: If no connection became free within timeout.
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                await asyncio.wait_for(self._condition.wait(), self.timeout)
+        try:
+            return await self._connect()
+        except Exception:
+            async with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    async def release(self, conn):
+        """
+        Returns a connection to the pool, rolling back any open transaction.
+        
+        Args:
+            conn: A connection obtained from acquire.
+        """
+        if conn.in_transaction:
+            await conn.rollback()
+        async with self._condition:
+            self._idle.append(conn)
+            self._condition.notify()
+
+    async def close_all(self):
+        """
+        Closes every idle connection.
+        """
+        if self._condition is None:
+            return
+        async with self._condition:
+            for conn in self._idle:
+                await conn.close()
+                self._created -= 1
+            self._idle = []
+
+    async def __aenter__(self):
+        """
+        Returns the pool itself.
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Closes every idle connection.
+        """
+        await self.close_all()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+# One async pool per event loop, since asyncio primitives are bound to a loop
+_async_pools = weakref.WeakKeyDictionary()
+
+# Reusable cursor per connection, keyed by id() since sqlite3.Connection
+# objects cannot be weakly referenced
+_cursors = {}
+
+
+def cached_cursor(conn):
+    """
+    Returns a cursor that is kept and reused for every call on conn.
+    
+    Saves creating a cursor object per query; the SQL itself is compiled once
+    and reused from the connection's prepared statement cache. The caller must
+    consume the results before the next call on the same connection.
+    
+    Args:
+        conn: SQLite database connection.
+    
+    Returns:
+        sqlite3.Cursor: The connection's reusable cursor.
+    """
+    cursor = _cursors.get(id(conn))
+    if cursor is None or cursor.connection is not conn:
+        cursor = _cursors[id(conn)] = conn.cursor()
+    return cursor
+
+
+def get_pool():
+    """
+    Returns the shared pool for 'users.db', creating it on first use.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
+
+
+def get_async_pool():
+    """
+    Returns the AsyncConnectionPool for 'users.db' on the running event loop.
+    
+    Call close_async_pool() before the loop ends.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        pool = _async_pools[loop] = AsyncConnectionPool()
+    return pool
+
+
+async def close_async_pool():
+    """
+    Closes the running event loop's shared async pool, if it has one.
+    """
+    pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close_all()
+
+
+def with_db_connection(func=None, *, pool=None):
+    """
+    A decorator that provides a pooled SQLite database connection.
+    
+    Can be used as @with_db_connection or @with_db_connection(pool=...).
+    Coroutine functions receive an aiosqlite connection from an async pool.
+    
+    Args:
+        func: The function to be decorated (e.g., get_user_by_id).
+        pool: The ConnectionPool, or AsyncConnectionPool for coroutine
+            functions, to borrow from (default: the shared pool).
+    
+    Returns:
+        wrapper: A function that borrows a connection, passes it as the first
+        argument to the original function and returns it to the pool.
+    """
+    if func is None:
+        return lambda f: with_db_connection(f, pool=pool)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            connection_pool = pool or get_async_pool()
+            conn = await connection_pool.acquire()
+            try:
+                return await func(conn, *args, **kwargs)
+            finally:
+                await connection_pool.release(conn)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        connection_pool = pool or get_pool()
+        conn = connection_pool.acquire()
+        try:
+            # Call the original function, passing the connection as the first argument
+            return func(conn, *args, **kwargs)
+        finally:
+            # Ensure the connection goes back to the pool, even if an error occurs
+            connection_pool.release(conn)
+    return wrapper
@@ -0,0 +1,390 @@
+import re
+import sys
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# Tables read by a query, used to tag cache entries
+READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+# Tables modified by a statement, used to invalidate tagged entries
+WRITTEN_TABLES = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|'
+    r'UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE
+)
+
+_caches = weakref.WeakSet()
+
+# Result of an async load whose leader was cancelled; waiters load again
+_ABANDONED = object()
+
+
+def tables_in(query):
+    """
+    Returns the names of the tables a query reads from.
+    
+    Args:
+        query: The SQL query.
+    
+    Returns:
+        A frozenset of lower-case table names.
+    """
+    return frozenset(name.lower() for name in READ_TABLES.findall(query))
+
+
+def written_tables(statements):
+    """
+    Returns the names of the tables modified by a list of SQL statements.
+    
+    Args:
+        statements: Iterable of executed SQL statements.
+    
+    Returns:
+        A set of lower-case table names.
+    """
+    tables = set()
+    for statement in statements:
+        match = WRITTEN_TABLES.match(statement)
+        if match:
+            tables.add(match.group(1).lower())
+    return tables
+
+
+def make_key(query, args=(), kwargs=None):
+    """
+    Builds a cache key from the query text and its bound parameters.
+    
+    Args:
+        query: The SQL query.
+        args: Positional parameters passed along with the query.
+        kwargs: Keyword parameters passed along with the query.
+    
+    Returns:
+        A hashable key.
+    """
+    return (query, _freeze(args), _freeze(kwargs or {}))
+
+
+def _freeze(value):
+    """
+    Converts lists and dicts to hashable tuples, recursively.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def estimate_size(value):
+    """
+    Approximates the memory held by a query result, in bytes.
+    
+    Args:
+        value: A result, typically a list of row tuples.
+    
+    Returns:
+        The estimated size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+def invalidate_tables(tables):
+    """
+    Evicts entries tagged with any of the given tables from every cache.
+    
+    Args:
+        tables: Iterable of table names.
+    """
+    tables = {table.lower() for table in tables}
+    if not tables:
+        return
+    for cache in list(_caches):
+        cache.invalidate_tables(tables)
+
+
+class _Flight:
+    """
+    A load in progress that other callers can wait on.
+    """
+    def __init__(self):
+        """
+        Initialize an unfinished load.
+        """
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QueryCache:
+    """
+    A thread-safe LRU cache of query results with TTL and table tags.
+    
+    Entries are evicted when the cache holds more than max_entries entries
+    or max_bytes estimated bytes, when their TTL expires, or when one of the
+    tables they read is modified through invalidate_tables.
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=300):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_entries: Maximum number of cached results (default: 1024).
+            max_bytes: Maximum estimated size of all results (default: 64 MiB).
+            ttl: Default lifetime of an entry in seconds, or None to keep
+                entries until evicted (default: 300).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "coalesced": 0,
+        }
+        self._in_flight = {}
+        self._async_in_flight = {}
+        # Bumped on every invalidation so in-flight loads can tell whether
+        # their result went stale before it arrived
+        self._generations = {}
+        self._clears = 0
+        _caches.add(self)
+
+    def get(self, key):
+        """
+        Looks up a cached result.
+        
+        Args:
+            key: A key built by make_key.
+        
+        Returns:
+            A (hit, value) tuple; value is None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is not None \
+                    and entry[3] <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, entry[0]
+
+    def set(self, key, value, tables=(), ttl=None):
+        """
+        Stores a result, evicting least recently used entries if needed.
+        
+        Args:
+            key: A key built by make_key.
+            value: The query result.
+            tables: Tables the query reads, used for invalidation.
+            ttl: Lifetime in seconds (default: the cache's ttl).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + ttl if ttl is not None else None
+        tables = frozenset(table.lower() for table in tables)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, tables, expires)
+            self._bytes += size
+            for table in tables:
+                self._tags.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries \
+                    or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _generation(self, tables):
+        """
+        Returns the invalidation state of tables. Must be called with the
+        lock held.
+        """
+        return self._clears, tuple(
+            self._generations.get(table.lower(), 0) for table in tables)
+
+    def _set_if_current(self, key, value, tables, ttl, generation):
+        """
+        Stores a loaded result unless its tables were invalidated (or the
+        cache cleared) since generation was taken.
+        """
+        with self._lock:
+            if self._generation(tables) == generation:
+                self.set(key, value, tables=tables, ttl=ttl)
+
+    def get_or_load(self, key, loader, tables=(), ttl=None):
+        """
+        Returns the cached result for key, loading it at most once.
+        
+        Concurrent misses for the same key are coalesced: the first caller
+        runs loader and the others wait for its result (or its exception)
+        instead of running the query themselves. A result whose tables are
+        invalidated while it loads is returned but not cached.
+        
+        Args:
+            key: A key built by make_key.
+            loader: Callable with no arguments that produces the result.
+            tables: Tables the query reads, used for invalidation.
+            ttl: Lifetime in seconds (default: the cache's ttl).
+        
+        Returns:
+            A (source, value) tuple where source is "hit", "coalesced" or
+            "loaded".
+        """
+        with self._lock:
+            hit, value = self.get(key)
+            if hit:
+                return "hit", value
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+                generation = self._generation(tables)
+            else:
+                self._stats["coalesced"] += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return "coalesced", flight.value
+        
+        try:
+            flight.value = loader()
+            self._set_if_current(key, flight.value, tables, ttl, generation)
+            return "loaded", flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    async def aget_or_load(self, key, loader, tables=(), ttl=None):
+        """
+        The asyncio version of get_or_load.
+        
+        Concurrent misses on the same event loop await a single load instead
+        of blocking a thread. If the caller running the load is cancelled,
+        the waiters are not: one of them starts the load again.
+        
+        Args:
+            key: A key built by make_key.
+            loader: Callable with no arguments returning an awaitable result.
+            tables: Tables the query reads, used for invalidation.
+            ttl: Lifetime in seconds (default: the cache's ttl).
+        
+        Returns:
+            A (source, value) tuple where source is "hit", "coalesced" or
+            "loaded".
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            hit, value = self.get(key)
+            if hit:
+                return "hit", value
+            future = self._async_in_flight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._async_in_flight[flight_key] = loop.create_future()
+                generation = self._generation(tables)
+            else:
+                self._stats["coalesced"] += 1
+        
+        if not leader:
+            value = await asyncio.shield(future)
+            if value is _ABANDONED:
+                return await self.aget_or_load(key, loader, tables, ttl)
+            return "coalesced", value
+        
+        try:
+            value = await loader()
+            self._set_if_current(key, value, tables, ttl, generation)
+            future.set_result(value)
+            return "loaded", value
+        except asyncio.CancelledError:
+            # Cancelling the shared future would cancel every waiter too
+            future.set_result(_ABANDONED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody is waiting
+            raise
+        finally:
+            with self._lock:
+                del self._async_in_flight[flight_key]
+
+    def _remove(self, key):
+        """
+        Drops one entry and its tags. Must be called with the lock held.
+        """
+        _, size, tables, _ = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._tags.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[table]
+
+    def invalidate_tables(self, tables):
+        """
+        Evicts every entry that reads one of the given tables.
+        
+        Args:
+            tables: Iterable of lower-case table names.
+        """
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in list(self._tags.get(table, ())):
+                    self._remove(key)
+                    self._stats["invalidations"] += 1
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+            self._clears += 1
+
+    def stats(self):
+        """
+        Returns hit, miss, eviction, expiration, invalidation and coalesced
+        counts, along with the current number of entries and bytes.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
+
+    def __len__(self):
+        """
+        Returns the number of cached entries.
+        """
+        return len(self._entries)
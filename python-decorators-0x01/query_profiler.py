@@ -0,0 +1,184 @@
+import math
+import random
+import re
+import sqlite3
+import threading
+from array import array
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(query):
+    """
+    Normalizes a query so that queries differing only in literals match.
+    
+    String and numeric literals become ?, lists of placeholders collapse to
+    (?+), whitespace is collapsed and the text is lower-cased.
+    
+    Args:
+        query: The SQL query.
+    
+    Returns:
+        The normalized query text.
+    """
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    query = _IN_LIST.sub("(?+)", query)
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile of an already sorted sequence.
+    """
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class QueryProfiler:
+    """
+    Aggregates query timings per fingerprint and reports the most expensive.
+    
+    Count, total and slowest cover every call. Percentiles come from a
+    uniform reservoir sample of at most samples durations per fingerprint,
+    so memory stays bounded however long the process runs.
+    """
+    def __init__(self, samples=1000):
+        """
+        Initialize an empty profile.
+        
+        Args:
+            samples: Maximum number of durations kept per fingerprint.
+        """
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+    def record(self, query, params, duration, rows):
+        """
+        Adds one executed query to the profile.
+        
+        Args:
+            query: The SQL query text.
+            params: Positional parameters bound to the query.
+            duration: Elapsed seconds.
+            rows: Number of rows returned.
+        """
+        key = fingerprint(query)
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = {
+                    "count": 0,
+                    "total": 0.0,
+                    "rows": 0,
+                    "durations": array("d"),
+                    "slowest": 0.0,
+                    "sample": (query, params),
+                }
+            profile["count"] += 1
+            profile["total"] += duration
+            profile["rows"] += rows
+            durations = profile["durations"]
+            if len(durations) < self.samples:
+                durations.append(duration)
+            else:
+                # Reservoir sampling: every call so far is kept with equal
+                # probability samples / count
+                slot = random.randrange(profile["count"])
+                if slot < self.samples:
+                    durations[slot] = duration
+            if duration >= profile["slowest"]:
+                profile["slowest"] = duration
+                profile["sample"] = (query, params)
+
+    def summary(self, top=10):
+        """
+        Returns per-fingerprint statistics, most total time first.
+        
+        Args:
+            top: Number of fingerprints to return, or None for all.
+        
+        Returns:
+            List of dicts with fingerprint, count, total, p50, p95, p99, rows
+            and a sample query with its parameters.
+        """
+        with self._lock:
+            profiles = [
+                (key, dict(profile), sorted(profile["durations"]))
+                for key, profile in self._profiles.items()
+            ]
+        summary = []
+        for key, profile, ordered in profiles:
+            summary.append({
+                "fingerprint": key,
+                "count": profile["count"],
+                "total": profile["total"],
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+                "rows": profile["rows"],
+                "sample": profile["sample"],
+            })
+        summary.sort(key=lambda item: item["total"], reverse=True)
+        return summary if top is None else summary[:top]
+
+    def explain(self, query, params=(), database='users.db'):
+        """
+        Runs EXPLAIN QUERY PLAN for a query.
+        
+        Returns:
+            List of plan detail strings, or the error message.
+        """
+        conn = sqlite3.connect(database)
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            return [row[-1] for row in rows]
+        except sqlite3.Error as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            conn.close()
+
+    def report(self, top=10, explain=0, database='users.db'):
+        """
+        Formats the top-N fingerprints as a text report.
+        
+        Args:
+            top: Number of fingerprints to include.
+            explain: Number of slowest fingerprints (by p99) to run
+                EXPLAIN QUERY PLAN for.
+            database: Database used for EXPLAIN QUERY PLAN.
+        
+        Returns:
+            The report as a string.
+        """
+        summary = self.summary(top)
+        lines = [
+            f"{'count':>7} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'rows':>8}  fingerprint"
+        ]
+        for item in summary:
+            lines.append(
+                f"{item['count']:>7} {item['total'] * 1000:>10.2f} "
+                f"{item['p50'] * 1000:>8.2f} {item['p95'] * 1000:>8.2f} "
+                f"{item['p99'] * 1000:>8.2f} {item['rows']:>8}  "
+                f"{item['fingerprint']}"
+            )
+        slowest = sorted(summary, key=lambda item: item["p99"], reverse=True)
+        for item in slowest[:explain]:
+            query, params = item["sample"]
+            lines.append(f"\nEXPLAIN QUERY PLAN {query}")
+            for detail in self.explain(query, params, database):
+                lines.append(f"  {detail}")
+        return "\n".join(lines)
+
+    def reset(self):
+        """
+        Discards every recorded query.
+        """
+        with self._lock:
+            self._profiles.clear()
@@ -0,0 +1,298 @@
+import atexit
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Decorator plumbing skipped when looking for the code that made a call
+WRAPPER_FUNCTIONS = frozenset(("wrapper", "async_wrapper"))
+WRAPPER_MODULES = frozenset(("query_tracer", "query_cache"))
+
+
+class QueryTracer:
+    """
+    Records query traces into an in-memory ring buffer and flushes them to a
+    JSON-lines file from a background thread.
+    
+    Recording only appends to a bounded deque, which is atomic under the GIL,
+    so traced calls never take a lock. When the buffer is full the oldest
+    records are dropped. Calls are timed always, but only a sample_rate
+    fraction of them is recorded, plus every call slower than slow_threshold.
+    """
+    def __init__(self, path='query_trace.jsonl', sample_rate=1.0,
+                 slow_threshold=0.1, capacity=10000, batch_size=500,
+                 flush_interval=1.0):
+        """
+        Initialize the tracer; the flush thread starts on the first record.
+        
+        Args:
+            path: JSON-lines file traces are appended to.
+            sample_rate: Fraction of calls recorded, from 0.0 to 1.0.
+            slow_threshold: Calls taking at least this many seconds are always
+                recorded, or None to disable.
+            capacity: Maximum number of records held in memory.
+            batch_size: Number of records that wakes the flush thread early.
+            flush_interval: Seconds between flushes.
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = collections.deque(maxlen=capacity)
+        self.dropped = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def should_record(self, duration):
+        """
+        Decides whether a call that took duration seconds is recorded.
+        """
+        if self.slow_threshold is not None and duration >= self.slow_threshold:
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, query, params, duration, rows, caller, error=None):
+        """
+        Appends one trace to the ring buffer.
+        
+        Args:
+            query: The SQL query text.
+            params: Bound parameters, stored only as a short hash.
+            duration: Elapsed seconds.
+            rows: Number of rows returned.
+            caller: "file:line function" of the calling code.
+            error: The exception the call raised, if any.
+        """
+        if self._thread is None:
+            self._start()
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append({
+            "ts": time.time(),
+            "query": query,
+            "params_hash": hashlib.blake2b(
+                repr(params).encode(), digest_size=8
+            ).hexdigest(),
+            "duration_ms": round(duration * 1000, 3),
+            "rows": rows,
+            "slow": self.slow_threshold is not None
+                    and duration >= self.slow_threshold,
+            "caller": caller,
+            "error": None if error is None else f"{type(error).__name__}: {error}",
+        })
+        if len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _start(self):
+        """
+        Starts the background flush thread once.
+        """
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="query-tracer", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        """
+        Flushes the buffer every flush_interval, or sooner when it fills up.
+        """
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every buffered record to the trace file.
+        """
+        lines = []
+        while True:
+            try:
+                lines.append(json.dumps(self.buffer.popleft(), default=str))
+            except IndexError:
+                break
+        if lines:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write("\n".join(lines) + "\n")
+
+    def close(self):
+        """
+        Stops the flush thread and writes any remaining records.
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+
+_default_tracer = None
+
+
+def enable_tracing(**options):
+    """
+    Turns on tracing for trace_queries calls that have no explicit tracer.
+    
+    Settings come from the QUERY_TRACE_* environment variables, overridden
+    by options. Setting QUERY_TRACE_PATH also enables tracing on first use.
+    
+    Args:
+        **options: QueryTracer arguments, used when the tracer is created.
+    
+    Returns:
+        The shared QueryTracer.
+    """
+    global _default_tracer
+    if _default_tracer is None:
+        threshold = os.environ.get('QUERY_TRACE_SLOW_THRESHOLD', '0.1')
+        settings = {
+            'path': os.environ.get('QUERY_TRACE_PATH', 'query_trace.jsonl'),
+            'sample_rate': float(os.environ.get('QUERY_TRACE_SAMPLE_RATE', '1.0')),
+            'slow_threshold': float(threshold) if threshold else None,
+        }
+        settings.update(options)
+        _default_tracer = QueryTracer(**settings)
+    return _default_tracer
+
+
+def get_tracer():
+    """
+    Returns the shared tracer, or None while tracing is off.
+    """
+    if _default_tracer is None and os.environ.get('QUERY_TRACE_PATH'):
+        return enable_tracing()
+    return _default_tracer
+
+
+def split_query(args, kwargs):
+    """
+    Finds the SQL query among a decorated function's arguments.
+    
+    The query is the 'query' keyword argument or else the first positional
+    string argument. Only the arguments after it are its parameters; those
+    before it, such as the connection injected by with_db_connection, are
+    left out.
+    
+    Returns:
+        A (query, (positional, keyword)) tuple; query is None and both
+        parameter collections are empty if no query was found.
+    """
+    if 'query' in kwargs:
+        params = {key: value for key, value in kwargs.items() if key != 'query'}
+        return kwargs['query'], ((), params)
+    for index, arg in enumerate(args):
+        if isinstance(arg, str):
+            return arg, (args[index + 1:], kwargs)
+    return None, ((), {})
+
+
+def find_caller(frame):
+    """
+    Walks up from frame past decorator wrappers to the code that made a call.
+    
+    Frames of functions named wrapper or async_wrapper, of the tracer and
+    cache modules, and of loader lambdas called by the cache are skipped.
+    
+    Returns:
+        The first frame outside the decorator stack, or None.
+    """
+    while frame is not None:
+        caller = frame.f_back
+        if frame.f_code.co_name in WRAPPER_FUNCTIONS \
+                or frame.f_globals.get('__name__') in WRAPPER_MODULES \
+                or (frame.f_code.co_name == '<lambda>' and caller is not None
+                    and caller.f_globals.get('__name__') in WRAPPER_MODULES):
+            frame = caller
+        else:
+            return frame
+    return None
+
+
+def count_rows(result):
+    """
+    Returns the number of rows in a query function's result.
+    """
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def trace_queries(func=None, *, tracer=None):
+    """
+    A decorator that records query text, parameters hash, duration, row count
+    and caller of every sampled or slow call. Calls that raise are recorded
+    with their error and the exception is re-raised.
+    
+    Can be used as @trace_queries or @trace_queries(tracer=...). For coroutine
+    functions the duration is the awaited time of the call. Without an
+    explicit tracer nothing is recorded until enable_tracing() is called.
+    
+    Args:
+        func: The function to be decorated.
+        tracer: The QueryTracer to record into (default: the shared tracer,
+            if tracing is enabled).
+    
+    Returns:
+        wrapper: A function that times and traces the original function.
+    """
+    if func is None:
+        return lambda f: trace_queries(f, tracer=tracer)
+
+    def finish(active, args, kwargs, duration, result=None, error=None):
+        """
+        Records the call if it is sampled, slow or failed.
+        """
+        if error is not None or active.should_record(duration):
+            frame = find_caller(sys._getframe(1))
+            query, params = split_query(args, kwargs)
+            active.record(
+                query, params, duration, count_rows(result),
+                f"{frame.f_code.co_filename}:{frame.f_lineno} "
+                f"{frame.f_code.co_name}" if frame is not None else None,
+                error
+            )
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            active = tracer or get_tracer()
+            if active is None:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                finish(active, args, kwargs, time.perf_counter() - start, error=e)
+                raise
+            finish(active, args, kwargs, time.perf_counter() - start, result)
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        active = tracer or get_tracer()
+        if active is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            finish(active, args, kwargs, time.perf_counter() - start, error=e)
+            raise
+        finish(active, args, kwargs, time.perf_counter() - start, result)
+        return result
+    return wrapper
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Unit tests for coalesced loads in query_cache.py
+"""
+
+import asyncio
+import unittest
+
+from query_cache import QueryCache, make_key
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    """
+    Test class for aget_or_load when the loading caller is cancelled
+    """
+
+    def test_cancelled_leader_hands_load_to_waiters(self) -> None:
+        """
+        Test that waiters survive the leader's cancellation and load once
+        """
+        cache = QueryCache()
+        key = make_key("SELECT * FROM users", ())
+        loads = []
+
+        async def stuck():
+            await asyncio.sleep(10)
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return ["row"]
+
+        async def scenario():
+            leader = asyncio.ensure_future(
+                cache.aget_or_load(key, stuck, ("users",)))
+            await asyncio.sleep(0)
+            waiters = [
+                asyncio.ensure_future(cache.aget_or_load(key, load, ("users",)))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*waiters)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(sorted(source for source, _ in results),
+                         ["coalesced", "loaded"])
+        self.assertEqual([value for _, value in results], [["row"], ["row"]])
+        self.assertEqual(len(loads), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
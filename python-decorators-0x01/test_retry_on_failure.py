@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Unit tests for retry_on_failure in 3-retry_on_failure.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+retry_module = __import__('3-retry_on_failure')
+retry_on_failure = retry_module.retry_on_failure
+CircuitBreaker = retry_module.CircuitBreaker
+CircuitOpenError = retry_module.CircuitOpenError
+
+
+class TestRetryOnLockContention(unittest.TestCase):
+    """
+    Test class for retries against a database locked by another connection
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a database and hold an exclusive lock on it
+        """
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        setup = sqlite3.connect(self.path)
+        setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        setup.execute("INSERT INTO users VALUES (1, 'old@example.com')")
+        setup.commit()
+        setup.close()
+        self.holder = sqlite3.connect(self.path, check_same_thread=False)
+        self.holder.execute("BEGIN EXCLUSIVE")
+
+    def tearDown(self) -> None:
+        """
+        Release the lock and remove the database
+        """
+        self.holder.close()
+        os.remove(self.path)
+
+    def update_email(self, calls: list) -> None:
+        """
+        Write to the database without waiting on the busy handler
+        """
+        calls.append(1)
+        conn = sqlite3.connect(self.path, timeout=0)
+        try:
+            conn.execute("UPDATE users SET email = 'new@example.com' WHERE id = 1")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def test_retries_until_lock_released(self) -> None:
+        """
+        Test that a locked database is retried and succeeds once released
+        """
+        calls = []
+        update = retry_on_failure(retries=10, delay=0.02, max_delay=0.05)(
+            self.update_email
+        )
+        threading.Timer(0.1, self.holder.rollback).start()
+        update(calls)
+        self.assertGreater(len(calls), 1)
+
+    def test_gives_up_after_retries(self) -> None:
+        """
+        Test that the lock error is raised once all attempts are used
+        """
+        calls = []
+        update = retry_on_failure(retries=3, delay=0.001)(self.update_email)
+        with self.assertRaises(sqlite3.OperationalError):
+            update(calls)
+        self.assertEqual(len(calls), 3)
+
+    def test_deadline_stops_retries(self) -> None:
+        """
+        Test that no retry starts after the overall deadline
+        """
+        calls = []
+        update = retry_on_failure(retries=1000, delay=0.05, max_delay=0.05,
+                                  deadline=0.2)(self.update_email)
+        with self.assertRaises(sqlite3.OperationalError):
+            update(calls)
+        self.assertLess(len(calls), 1000)
+
+    def test_circuit_breaker_fails_fast(self) -> None:
+        """
+        Test that an open circuit stops calls from reaching the database
+        """
+        calls = []
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        update = retry_on_failure(retries=2, delay=0.001, breaker=breaker)(
+            self.update_email
+        )
+        with self.assertRaises(sqlite3.OperationalError):
+            update(calls)
+        with self.assertRaises(CircuitOpenError):
+            update(calls)
+        self.assertEqual(len(calls), 2)
+
+    def test_cancelled_trial_does_not_wedge_circuit(self) -> None:
+        """
+        Test that a cancelled half-open trial lets a later call through
+        """
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        behaviour = ["locked"]
+
+        @retry_on_failure(retries=1, breaker=breaker)
+        async def query():
+            if behaviour[0] == "locked":
+                raise sqlite3.OperationalError("database is locked")
+            if behaviour[0] == "slow":
+                await asyncio.sleep(10)
+            return "ok"
+
+        async def scenario():
+            with self.assertRaises(sqlite3.OperationalError):
+                await query()
+            await asyncio.sleep(0.06)
+            behaviour[0] = "slow"
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(query(), 0.01)
+            behaviour[0] = "ok"
+            return await query()
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+
+    def test_non_trial_failure_keeps_trial_running(self) -> None:
+        """
+        Test that a call started before the circuit opened cannot release
+        the half-open trial by failing while the trial runs
+        """
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+
+        @retry_on_failure(retries=1, breaker=breaker)
+        async def query(gate, error):
+            await gate.wait()
+            if error:
+                raise sqlite3.OperationalError("database is locked")
+            return "ok"
+
+        async def scenario():
+            released, stalled = asyncio.Event(), asyncio.Event()
+            released.set()
+            straggler = asyncio.ensure_future(query(stalled, True))
+            await asyncio.sleep(0)
+            with self.assertRaises(sqlite3.OperationalError):
+                await query(released, True)
+            await asyncio.sleep(0.06)
+            trial_gate = asyncio.Event()
+            trial = asyncio.ensure_future(query(trial_gate, False))
+            await asyncio.sleep(0)
+            stalled.set()
+            with self.assertRaises(sqlite3.OperationalError):
+                await straggler
+            await asyncio.sleep(0.06)
+            with self.assertRaises(CircuitOpenError):
+                await query(released, False)
+            trial_gate.set()
+            return await trial
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+
+
+class TestRetryClassification(unittest.TestCase):
+    """
+    Test class for error classification and backoff
+    """
+
+    def test_programming_error_not_retried(self) -> None:
+        """
+        Test that non-transient errors are raised on the first attempt
+        """
+        calls = []
+
+        @retry_on_failure(retries=5, delay=0.001)
+        def broken():
+            calls.append(1)
+            raise sqlite3.OperationalError("no such table: missing")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            broken()
+        self.assertEqual(len(calls), 1)
+
+    @patch('random.uniform', side_effect=lambda low, high: high)
+    @patch('time.sleep')
+    def test_exponential_backoff(self, mock_sleep, _) -> None:
+        """
+        Test that the backoff window doubles up to max_delay
+        """
+        @retry_on_failure(retries=5, delay=1, max_delay=5)
+        def locked():
+            raise sqlite3.OperationalError("database is locked")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            locked()
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.call_args_list],
+            [1, 2, 4, 5]
+        )
+
+    def test_async_variant_uses_asyncio_sleep(self) -> None:
+        """
+        Test that coroutine functions are retried without blocking
+        """
+        attempts = []
+
+        @retry_on_failure(retries=3, delay=0.001)
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise sqlite3.OperationalError("database is locked")
+            return "ok"
+
+        with patch('time.sleep') as mock_sleep:
+            self.assertEqual(asyncio.run(flaky()), "ok")
+        mock_sleep.assert_not_called()
+        self.assertEqual(len(attempts), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for nested use of batched_transaction in 2-transactional.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from db_connection import ConnectionPool, with_db_connection
+
+transactional_module = __import__('2-transactional')
+TransactionBatch = transactional_module.TransactionBatch
+batched_transaction = transactional_module.batched_transaction
+transactional = transactional_module.transactional
+
+
+class TestNestedBatches(unittest.TestCase):
+    """
+    Test class for batches and pinned connections nested in one thread
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a database with one user and a pool over it
+        """
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        setup = sqlite3.connect(self.path)
+        setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)")
+        setup.execute("INSERT INTO users VALUES (1, 'old@example.com')")
+        setup.commit()
+        setup.close()
+        self.pool = ConnectionPool(self.path, size=2)
+
+        @with_db_connection(pool=self.pool)
+        @transactional
+        def update_email(conn, new_email):
+            conn.execute("UPDATE users SET email = ? WHERE id = 1", (new_email,))
+
+        self.update_email = update_email
+
+    def tearDown(self) -> None:
+        """
+        Close the pool and remove the database
+        """
+        self.pool.close_all()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def committed_email(self) -> str:
+        """
+        Read the email as another connection sees it
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT email FROM users WHERE id = 1").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_nested_pinned_keeps_outer_pin(self) -> None:
+        """
+        Test that leaving a nested pinned block does not release the connection
+        """
+        with self.pool.pinned() as outer:
+            with self.pool.pinned() as inner:
+                self.assertIs(inner, outer)
+            self.assertNotIn(outer, self.pool._idle)
+            self.assertIs(self.pool.acquire(), outer)
+        self.assertIn(outer, self.pool._idle)
+
+    def test_nested_batch_joins_outer(self) -> None:
+        """
+        Test that an inner batched_transaction commits with the outer one
+        """
+        with batched_transaction(max_seconds=60, pool=self.pool) as outer:
+            with batched_transaction(max_seconds=60, pool=self.pool) as inner:
+                self.assertIs(inner, outer)
+                self.update_email("inner@example.com")
+            self.assertEqual(self.committed_email(), "old@example.com")
+            self.update_email("outer@example.com")
+        self.assertEqual(self.committed_email(), "outer@example.com")
+        self.assertEqual(outer.commits, 1)
+
+    def test_batch_on_other_connection_restores_outer(self) -> None:
+        """
+        Test that the outer batch is active again after an inner batch exits
+        """
+        other = sqlite3.connect(self.path)
+        try:
+            with batched_transaction(max_seconds=60, pool=self.pool) as outer:
+                with TransactionBatch(other):
+                    pass
+                self.update_email("outer@example.com")
+                self.assertEqual(self.committed_email(), "old@example.com")
+        finally:
+            other.close()
+        self.assertEqual(self.committed_email(), "outer@example.com")
+        self.assertEqual(outer.commits, 1)
+
+    def test_same_connection_batch_rejected(self) -> None:
+        """
+        Test that a second TransactionBatch on the active connection is refused
+        """
+        with batched_transaction(pool=self.pool) as outer:
+            with self.assertRaises(RuntimeError):
+                with TransactionBatch(outer.conn):
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,25 +1,30 @@
 #!/usr/bin/python3
-import mysql.connector
 from mysql.connector import Error
 
-def stream_users():
-    """Generator function to stream rows from the user_data table one by one."""
+import db_pool
+
+def stream_users(server_side=True, fetch_size=100):
+    """Generator function to stream rows from the user_data table one by one.
+
+    By default (server_side=True) the cursor is unbuffered, which is also
+    mysql.connector's own default, and rows are pulled from the server
+    fetch_size at a time, so client memory stays bounded by fetch_size
+    regardless of the table size. server_side=False uses a buffered cursor
+    that reads the whole result set into client memory on execute.
+    """
+    connection = None
+    cursor = None
     try:
-        # Connect to the ALX_prodev database
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="your_username",  # Replace with your MySQL username
-            password="your_password",  # Replace with your MySQL password
-            database="ALX_prodev"
-        )
+        # Borrow a connection to the ALX_prodev database from the pool
+        connection = db_pool.connect()
         
-        if connection.is_connected():
-            cursor = connection.cursor()
+        if connection:
+            cursor = connection.cursor(buffered=not server_side)
             # Execute query to fetch all rows from user_data
             cursor.execute("SELECT user_id, name, email, age FROM user_data")
             
             # Use one loop to yield rows as dictionaries
-            for row in cursor:
+            for row in _iter_rows(cursor, fetch_size if server_side else None):
                 yield {
                     'user_id': row[0],
                     'name': row[1],
@@ -30,6 +35,33 @@ def stream_users():
     except Error as e:
         print(f"Error streaming data: {e}")
     finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
\ No newline at end of file
+        close_streaming_cursor(cursor)
+        if connection:
+            connection.close()
+
+
+def _iter_rows(cursor, fetch_size):
+    """Iterates over cursor rows, fetch_size rows per round trip if given."""
+    if fetch_size is None:
+        yield from cursor
+        return
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        yield from rows
+
+
+def close_streaming_cursor(cursor):
+    """Closes cursor, ignoring rows left unread by an abandoned stream.
+
+    An unbuffered cursor that is closed before its result set is exhausted
+    raises "Unread result found"; closing the connection afterwards discards
+    the remaining rows without reading them.
+    """
+    if cursor is None:
+        return
+    try:
+        cursor.close()
+    except Error:
+        pass
@@ -4,47 +4,117 @@ Batch processing module for handling large datasets using generators.
 This module provides functions to stream and process user data in batches.
 """
 
-import mysql.connector
+import operator
+import sys
+from array import array
+
 from mysql.connector import Error
 
+import db_pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+close_streaming_cursor = __import__('0-stream_users').close_streaming_cursor
+
+USER_COLUMNS = ("user_id", "name", "email", "age")
+SQL_OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "LIKE")
+COMPARISONS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
 
 def connect_db():
     """
-    Establishes connection to the MySQL database.
+    Borrows a connection to the MySQL database from the shared pool.
+    Closing it returns it to the pool.
     
     Returns:
-        mysql.connector.connection: Database connection object or None if failed
+        db_pool.PooledConnection: Database connection object or None if failed
     """
-    try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            database='ALX_prodev',
-            user='root',
-            password='root'
-        )
-        return connection
-    except Error as e:
-        print(f"Error connecting to database: {e}")
-        return None
+    return db_pool.connect()
 
 
-def stream_users_in_batches(batch_size):
+def build_user_query(columns=None, predicates=()):
     """
-    Generator function that fetches users from database in batches.
+    Compiles a column list and predicates into a parameterized query.
+    
+    Predicates are either (column, operator, value) tuples, which are pushed
+    down into the WHERE clause, or callables taking a row dictionary, which
+    are applied in Python after the rows are fetched. Callables only see the
+    selected columns.
     
     Args:
-        batch_size (int): Number of records to fetch per batch
+        columns (list): Columns to select, or None for all user columns
+        predicates (list): Tuple predicates and/or callables
         
-    Yields:
-        list: Batch of user records as dictionaries
+    Returns:
+        tuple: (query, params, python_predicates)
+    
+    Raises:
+        ValueError: If a column or operator is not supported
+    """
+    columns = list(columns) if columns else list(USER_COLUMNS)
+    for column in columns:
+        if column not in USER_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+    
+    clauses = []
+    params = []
+    python_predicates = []
+    for predicate in predicates:
+        if callable(predicate):
+            python_predicates.append(predicate)
+            continue
+        column, op, value = predicate
+        op = op.upper()
+        if column not in USER_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        if op == "IN":
+            values = list(value)
+            if not values:
+                clauses.append("FALSE")
+                continue
+            placeholders = ", ".join(["%s"] * len(values))
+            clauses.append(f"{column} IN ({placeholders})")
+            params.extend(values)
+        elif op in SQL_OPERATORS:
+            clauses.append(f"{column} {op} %s")
+            params.append(value)
+        else:
+            raise ValueError(f"Unsupported operator: {op}")
+    
+    query = f"SELECT {', '.join(columns)} FROM user_data"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query, tuple(params), python_predicates
+
+
+def _stream_batches(batch_size, server_side, query, params, dictionary,
+                    raise_errors=False):
+    """
+    Executes query and yields fetchmany batches of rows.
+    
+    Database errors are printed and end the stream, unless raise_errors is
+    set, in which case they (and connection failures) are raised.
     """
     connection = connect_db()
     if not connection:
+        if raise_errors:
+            raise ConnectionError("Could not connect to the database")
         return
     
+    cursor = None
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT user_id, name, email, age FROM user_data")
+        cursor = connection.cursor(dictionary=dictionary, buffered=not server_side)
+        cursor.execute(query, params)
         
         while True:
             batch = cursor.fetchmany(batch_size)
@@ -53,23 +123,206 @@ def stream_users_in_batches(batch_size):
             yield batch
                 
     except Error as e:
+        if raise_errors:
+            raise
         print(f"Error fetching data: {e}")
     finally:
-        if connection and connection.is_connected():
-            cursor.close()
+        close_streaming_cursor(cursor)
+        if connection:
             connection.close()
 
 
-def batch_processing(batch_size):
+def stream_users_in_batches(batch_size, server_side=True, columns=None,
+                            predicates=(), raise_errors=False):
+    """
+    Generator function that fetches users from database in batches.
+    
+    Args:
+        batch_size (int): Number of records to fetch per batch
+        server_side (bool): Use an unbuffered cursor so only batch_size rows
+            are held in client memory at a time; False buffers the whole
+            result set on execute (default: True)
+        columns (list): Columns to select, or None for all user columns
+        predicates (list): Filters compiled by build_user_query
+        raise_errors (bool): Raise database errors instead of printing them
+            and ending the stream early (default: False)
+        
+    Yields:
+        list: Batch of user records as dictionaries
+    """
+    query, params, python_predicates = build_user_query(columns, predicates)
+    for batch in _stream_batches(batch_size, server_side, query, params,
+                                 dictionary=True, raise_errors=raise_errors):
+        if python_predicates:
+            batch = [
+                row for row in batch
+                if all(predicate(row) for predicate in python_predicates)
+            ]
+            if not batch:
+                continue
+        yield batch
+
+
+def stream_user_columns(batch_size, server_side=True, columns=None,
+                        predicates=(), use_numpy=False, raise_errors=False):
+    """
+    Generator function that fetches users in column-oriented batches.
+    
+    Rows are fetched as tuples and transposed into one vector per column:
+    age becomes an array.array of doubles (or a float64 NumPy array when
+    use_numpy is set), the other columns become lists of strings. No
+    per-row dictionary is ever built.
+    
+    Args:
+        batch_size (int): Number of records to fetch per batch
+        server_side (bool): Use an unbuffered cursor; False buffers the
+            whole result set on execute (default: True)
+        columns (list): Columns to select, or None for all user columns
+        predicates (list): Tuple filters compiled by build_user_query;
+            callables are not supported in this layout
+        use_numpy (bool): Return age as a NumPy array (default: False)
+        raise_errors (bool): Raise database errors instead of printing them
+            and ending the stream early (default: False)
+        
+    Yields:
+        dict: Column name mapped to the column's values for the batch
+    
+    Raises:
+        ValueError: If a callable predicate is given
+        ImportError: If use_numpy is set and NumPy is not installed
+    """
+    if use_numpy and np is None:
+        raise ImportError("NumPy is required for use_numpy=True")
+    query, params, python_predicates = build_user_query(columns, predicates)
+    if python_predicates:
+        raise ValueError("Callable predicates need row dictionaries; "
+                         "use stream_users_in_batches instead")
+    names = list(columns) if columns else list(USER_COLUMNS)
+    for batch in _stream_batches(batch_size, server_side, query, params,
+                                 dictionary=False, raise_errors=raise_errors):
+        vectors = {}
+        for name, values in zip(names, zip(*batch)):
+            if name != "age":
+                vectors[name] = list(values)
+            elif use_numpy:
+                vectors[name] = np.fromiter(values, dtype=np.float64,
+                                            count=len(batch))
+            else:
+                vectors[name] = array("d", map(float, values))
+        yield vectors
+
+
+def column_mask(vector, operator_symbol, value):
+    """
+    Evaluates a comparison against every value of a column vector.
+    
+    Args:
+        vector: array.array, list or NumPy array of column values
+        operator_symbol (str): One of =, !=, <, <=, >, >=
+        value: Value to compare with
+        
+    Returns:
+        Boolean NumPy array for NumPy input, otherwise a list of bools
+    """
+    compare = COMPARISONS[operator_symbol]
+    if np is not None and isinstance(vector, np.ndarray):
+        return compare(vector, value)
+    return [compare(item, value) for item in vector]
+
+
+def filter_columns(batch, mask):
+    """
+    Keeps the rows of a column-oriented batch where mask is true.
+    
+    Args:
+        batch (dict): Batch yielded by stream_user_columns
+        mask: Sequence of bools as returned by column_mask
+        
+    Returns:
+        dict: A new batch with the same column types
+    """
+    if np is not None and isinstance(mask, np.ndarray):
+        indexes = np.flatnonzero(mask)
+    else:
+        indexes = [i for i, keep in enumerate(mask) if keep]
+    filtered = {}
+    for name, vector in batch.items():
+        if np is not None and isinstance(vector, np.ndarray):
+            filtered[name] = vector[indexes]
+        elif isinstance(vector, array):
+            filtered[name] = array(vector.typecode,
+                                   (vector[i] for i in indexes))
+        else:
+            filtered[name] = [vector[i] for i in indexes]
+    return filtered
+
+
+class BufferedSink:
+    """
+    Collects output lines and writes them to a stream in large chunks.
+    """
+    def __init__(self, stream=None, buffer_size=1000):
+        """
+        Initialize the sink.
+        
+        Args:
+            stream: Writable text stream (default: sys.stdout)
+            buffer_size (int): Number of lines buffered before a write
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.lines = []
+
+    def write(self, record):
+        """
+        Buffers the string form of record as one output line.
+        """
+        self.lines.append(f"{record}\n")
+        if len(self.lines) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered lines to the stream.
+        """
+        if self.lines:
+            self.stream.write("".join(self.lines))
+            self.lines = []
+        self.stream.flush()
+
+    def __enter__(self):
+        """
+        Returns the sink itself.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Flushes any remaining lines.
+        """
+        self.flush()
+
+
+def batch_processing(batch_size, predicates=(("age", ">", 25),), columns=None,
+                     sink=None):
     """
     Processes batches of users and filters those over age 25.
     
+    The filter is evaluated by the database; only matching rows are sent.
+    
     Args:
         batch_size (int): Size of each batch to process
+        predicates (list): Filters compiled by build_user_query
+            (default: age > 25)
+        columns (list): Columns to output, or None for all user columns
+        sink (BufferedSink): Output sink (default: buffered stdout)
         
     Prints filtered user records to stdout.
     """
-    for batch in stream_users_in_batches(batch_size):
-        for user in batch:
-            if user['age'] > 25:
-                print(user)
\ No newline at end of file
+    sink = sink if sink is not None else BufferedSink()
+    with sink:
+        for batch in stream_users_in_batches(
+            batch_size, columns=columns, predicates=predicates
+        ):
+            for user in batch:
+                sink.write(user)
@@ -2,50 +2,176 @@
 """
 Lazy pagination module for efficiently loading paginated data from database.
 This module provides a generator-based approach to fetch data page by page.
+
+Two pagination modes are supported:
+    - "offset": LIMIT/OFFSET pages. Every page makes the server scan and
+      discard all earlier rows, so a full walk is quadratic.
+    - "keyset": seeks past the last user_id seen on the previous page using
+      the primary key, so deep pages cost the same as the first one.
+
+Connection and per-page timings are counted in pagination_stats.
 """
 
+import time
+
+import db_pool
 import seed
 
+OFFSET_QUERY = "SELECT * FROM user_data LIMIT %s OFFSET %s"
+KEYSET_QUERY = (
+    "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+)
+
+pagination_stats = {"connects": 0, "pages": 0, "page_seconds": 0.0}
+
+
+def reset_pagination_stats():
+    """
+    Resets the connect and page counters in pagination_stats.
+    """
+    pagination_stats.update(connects=0, pages=0, page_seconds=0.0)
+
 
-def paginate_users(page_size, offset):
+def time_per_page():
+    """
+    Average time spent fetching a page since the last reset.
+    
+    Returns:
+        float: Seconds per page, or 0.0 if no page was fetched
+    """
+    if not pagination_stats["pages"]:
+        return 0.0
+    return pagination_stats["page_seconds"] / pagination_stats["pages"]
+
+
+def _connect(pooled=True):
+    """
+    Gets a connection to ALX_prodev and counts real connects in
+    pagination_stats.
+    
+    A pooled borrow only counts when the pool had to open a new connection;
+    an unpooled connection is opened, and counted, every time.
+    """
+    if not pooled:
+        pagination_stats["connects"] += 1
+        return db_pool.connect_direct()
+    pool = db_pool.get_pool()
+    misses = pool.stats()["misses"]
+    connection = seed.connect_to_prodev()
+    pagination_stats["connects"] += pool.stats()["misses"] - misses
+    return connection
+
+
+def _fetch_page(cursor, query, params):
+    """
+    Executes a page query on cursor and records its duration.
+    """
+    start = time.perf_counter()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    pagination_stats["pages"] += 1
+    pagination_stats["page_seconds"] += time.perf_counter() - start
+    return rows
+
+
+def paginate_users(page_size, offset, pooled=True):
     """
     Fetches a page of users from the database.
     
     Args:
         page_size (int): Number of records to fetch per page
         offset (int): Starting position for the page
+        pooled (bool): Borrow from the shared pool instead of opening a new
+            connection (default: True)
         
     Returns:
         list: List of user records as dictionaries
     """
-    connection = seed.connect_to_prodev()
+    connection = _connect(pooled)
     cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
-    rows = cursor.fetchall()
+    rows = _fetch_page(cursor, OFFSET_QUERY, (page_size, offset))
+    connection.close()
+    return rows
+
+
+def paginate_users_keyset(page_size, last_user_id="", pooled=True):
+    """
+    Fetches the page of users that follows last_user_id in primary key order.
+    
+    Args:
+        page_size (int): Number of records to fetch per page
+        last_user_id (str): user_id of the last row of the previous page,
+            or an empty string to fetch the first page
+        pooled (bool): Borrow from the shared pool instead of opening a new
+            connection (default: True)
+        
+    Returns:
+        list: List of user records as dictionaries
+    """
+    connection = _connect(pooled)
+    cursor = connection.cursor(dictionary=True)
+    rows = _fetch_page(cursor, KEYSET_QUERY, (last_user_id, page_size))
     connection.close()
     return rows
 
 
-def lazy_paginate(page_size):
+def lazy_paginate(page_size, mode="offset", reuse_connection=True):
     """
     Generator function that lazily loads paginated user data.
     Only fetches the next page when needed.
+
+    By default a single connection and prepared statement are kept open for
+    the whole walk and closed when the generator finishes, is closed or is
+    garbage-collected.
     
     Args:
         page_size (int): Number of records per page
+        mode (str): "offset" for LIMIT/OFFSET pages or "keyset" to seek on
+            user_id (default: "offset")
+        reuse_connection (bool): Keep one connection for every page instead
+            of opening a new, unpooled connection per page (default: True)
         
     Yields:
         list: Page of user records as dictionaries
     """
+    if mode not in ("offset", "keyset"):
+        raise ValueError(f"Unknown pagination mode: {mode}")
+
+    connection = None
+    cursor = None
+    if reuse_connection:
+        connection = _connect()
+        if not connection:
+            return
+        cursor = connection.cursor(prepared=True, dictionary=True)
+
     offset = 0
+    last_user_id = ""
     
-    while True:
-        page = paginate_users(page_size, offset)
-        if not page:
-            break
-        yield page
-        offset += page_size
+    try:
+        while True:
+            if mode == "keyset" and cursor:
+                page = _fetch_page(
+                    cursor, KEYSET_QUERY, (last_user_id, page_size)
+                )
+            elif mode == "keyset":
+                page = paginate_users_keyset(page_size, last_user_id,
+                                             pooled=False)
+            elif cursor:
+                page = _fetch_page(cursor, OFFSET_QUERY, (page_size, offset))
+            else:
+                page = paginate_users(page_size, offset, pooled=False)
+            if not page:
+                break
+            yield page
+            offset += page_size
+            last_user_id = page[-1]['user_id']
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
 
 
 # Alias for the function name used in the test
-lazy_pagination = lazy_paginate
\ No newline at end of file
+lazy_pagination = lazy_paginate
@@ -4,79 +4,390 @@ Memory-efficient aggregation module using generators.
 This module calculates the average age of users without loading all data into memory.
 """
 
-import mysql.connector
+import math
+from array import array
+
 from mysql.connector import Error
 
+import db_pool
+
+close_streaming_cursor = __import__('0-stream_users').close_streaming_cursor
+
+SQL_AGGREGATES = {
+    "avg": "AVG({column})",
+    "count": "COUNT({column})",
+    "sum": "SUM({column})",
+    "min": "MIN({column})",
+    "max": "MAX({column})",
+    "var": "VAR_POP({column})",
+    "stddev": "STDDEV_POP({column})",
+}
+NUMERIC_COLUMNS = ("age",)
+GROUP_COLUMNS = ("user_id", "name", "email", "age")
+
 
 def connect_db():
     """
-    Establishes connection to the MySQL database.
+    Borrows a connection to the MySQL database from the shared pool.
+    Closing it returns it to the pool.
     
     Returns:
-        mysql.connector.connection: Database connection object or None if failed
+        db_pool.PooledConnection: Database connection object or None if failed
     """
-    try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            database='ALX_prodev',
-            user='root',
-            password='root'
-        )
-        return connection
-    except Error as e:
-        print(f"Error connecting to database: {e}")
-        return None
+    return db_pool.connect()
 
 
-def stream_user_ages():
+def stream_user_ages(batch_size=1000):
     """
     Generator function that yields user ages one by one from the database.
-    This approach is memory-efficient as it doesn't load all records at once.
+    This approach is memory-efficient as it doesn't load all records at once:
+    rows are fetched batch_size at a time instead of one round trip per row.
+    
+    Args:
+        batch_size (int): Number of rows fetched per round trip
     
     Yields:
         int: User age
     """
+    for batch in stream_age_batches(batch_size):
+        for age in batch:
+            yield age
+
+
+def stream_age_batches(batch_size=1000, column="age", group_by=None):
+    """
+    Generator function that yields batches of rows for aggregation.
+    
+    Args:
+        batch_size (int): Number of rows fetched per round trip
+        column (str): Numeric column to read
+        group_by (str): Optional grouping column, returned first in each row
+    
+    Yields:
+        list: Values, or (group, value) tuples when group_by is set
+    """
     connection = connect_db()
     if not connection:
         return
     
+    cursor = None
     try:
         cursor = connection.cursor()
-        cursor.execute("SELECT age FROM user_data")
+        if group_by:
+            cursor.execute(f"SELECT {group_by}, {column} FROM user_data")
+        else:
+            cursor.execute(f"SELECT {column} FROM user_data")
         
         while True:
-            row = cursor.fetchone()
-            if row is None:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
                 break
-            yield row[0]  # row[0] is the age column
+            if group_by:
+                yield rows
+            else:
+                yield [row[0] for row in rows]
                 
     except Error as e:
         print(f"Error fetching data: {e}")
     finally:
-        if connection and connection.is_connected():
-            cursor.close()
+        close_streaming_cursor(cursor)
+        if connection:
             connection.close()
 
 
-def calculate_average_age():
+def parse_percentile(func):
+    """
+    Returns the fraction for a percentile name such as "p95", or None.
+    """
+    if func.startswith("p") and func[1:].replace(".", "", 1).isdigit():
+        fraction = float(func[1:]) / 100
+        if 0 < fraction <= 1:
+            return fraction
+    return None
+
+
+class RunningStats:
     """
-    Calculates the average age of all users using the generator.
-    This function processes ages one by one without loading all data into memory.
+    Streaming, numerically stable statistics using Welford's algorithm.
+    
+    Values are folded in one at a time, so the mean and variance never need
+    the full data set. Percentiles do need every value; they are kept in a
+    compact array of doubles only when track_values is set.
+    """
+    def __init__(self, track_values=False):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            track_values (bool): Keep values so percentiles can be computed
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.values = array("d") if track_values else None
+
+    def add(self, value):
+        """
+        Folds one value into the statistics.
+        """
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if self.values is not None:
+            self.values.append(value)
+
+    def update(self, values):
+        """
+        Folds an iterable of values into the statistics.
+        """
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """
+        Combines statistics computed over a disjoint set of values.
+        
+        Uses Chan et al.'s pairwise update so partial results from
+        different partitions merge without loss of precision.
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.mean = other.mean
+            self.m2 = other.m2
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if self.minimum is None or value < self.minimum:
+                self.minimum = value
+            if self.maximum is None or value > self.maximum:
+                self.maximum = value
+        if self.values is not None and other.values is not None:
+            self.values.extend(other.values)
+        return self
+
+    def percentile(self, fraction):
+        """
+        Nearest-rank percentile, matching the SQL CUME_DIST computation.
+        """
+        if not self.count:
+            return None
+        if self.values is None:
+            raise ValueError("Percentiles need RunningStats(track_values=True)")
+        ordered = sorted(self.values)
+        return ordered[max(math.ceil(fraction * self.count) - 1, 0)]
+
+    def result(self, funcs):
+        """
+        Returns the requested aggregates as a dictionary.
+        
+        Args:
+            funcs (list): Names from SQL_AGGREGATES or percentiles like "p95"
+        """
+        empty = self.count == 0
+        values = {
+            "avg": None if empty else self.mean,
+            "count": self.count,
+            "sum": None if empty else self.total,
+            "min": self.minimum,
+            "max": self.maximum,
+            "var": None if empty else self.m2 / self.count,
+            "stddev": None if empty else math.sqrt(self.m2 / self.count),
+        }
+        results = {}
+        for func in funcs:
+            fraction = parse_percentile(func)
+            results[func] = (
+                self.percentile(fraction) if fraction else values[func]
+            )
+        return results
+
+
+def _validate(funcs, column, group_by):
+    """
+    Checks aggregate names and column names before they reach SQL.
+    """
+    if column not in NUMERIC_COLUMNS:
+        raise ValueError(f"Cannot aggregate column: {column}")
+    if group_by is not None and group_by not in GROUP_COLUMNS:
+        raise ValueError(f"Cannot group by column: {group_by}")
+    for func in funcs:
+        if func not in SQL_AGGREGATES and parse_percentile(func) is None:
+            raise ValueError(f"Unknown aggregate: {func}")
+
+
+def _to_number(value):
+    """
+    Converts DECIMAL results from the driver to float.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    return float(value)
+
+
+def aggregate_sql(funcs=("avg",), column="age", group_by=None):
+    """
+    Computes aggregates inside the database.
+    
+    Plain aggregates are computed in a single query. Each percentile is a
+    nearest-rank percentile computed with the CUME_DIST window function.
+    
+    Args:
+        funcs (list): Aggregate names, see RunningStats.result
+        column (str): Numeric column to aggregate
+        group_by (str): Optional grouping column
     
     Returns:
-        float: Average age of users, or 0 if no users found
+        dict: Aggregate name to value, or group to such a dict
+    
+    Raises:
+        Error: If the connection or a query fails
+    """
+    _validate(funcs, column, group_by)
+    plain = [func for func in funcs if func in SQL_AGGREGATES]
+    percentiles = [func for func in funcs if func not in SQL_AGGREGATES]
+    
+    connection = connect_db()
+    if not connection:
+        raise Error("Could not connect to the database")
+    
+    results = {}
+    cursor = connection.cursor()
+    try:
+        select = [SQL_AGGREGATES[func].format(column=column) for func in plain]
+        if group_by:
+            cursor.execute(
+                f"SELECT {group_by}, {', '.join(select or ['COUNT(*)'])} "
+                f"FROM user_data GROUP BY {group_by}"
+            )
+            for row in cursor.fetchall():
+                results[row[0]] = {
+                    func: _to_number(value)
+                    for func, value in zip(plain, row[1:])
+                }
+        elif plain:
+            cursor.execute(f"SELECT {', '.join(select)} FROM user_data")
+            row = cursor.fetchone()
+            results = {
+                func: _to_number(value) for func, value in zip(plain, row)
+            }
+        
+        partition = f"PARTITION BY {group_by} " if group_by else ""
+        for func in percentiles:
+            cursor.execute(
+                f"SELECT {'grp, ' if group_by else ''}MIN(val) FROM ("
+                f"SELECT {group_by + ' AS grp, ' if group_by else ''}"
+                f"{column} AS val, CUME_DIST() OVER "
+                f"({partition}ORDER BY {column}) AS dist FROM user_data"
+                f") ranked WHERE dist >= %s"
+                f"{' GROUP BY grp' if group_by else ''}",
+                (parse_percentile(func),)
+            )
+            for row in cursor.fetchall():
+                if group_by:
+                    results.setdefault(row[0], {})[func] = _to_number(row[1])
+                else:
+                    results[func] = _to_number(row[0])
+    finally:
+        cursor.close()
+        connection.close()
+    return results
+
+
+def aggregate_stream(funcs=("avg",), column="age", group_by=None,
+                     batch_size=1000):
     """
-    total_age = 0
-    count = 0
+    Computes aggregates client side over fetchmany batches.
     
-    for age in stream_user_ages():
-        total_age += age
-        count += 1
+    Args:
+        funcs (list): Aggregate names, see RunningStats.result
+        column (str): Numeric column to aggregate
+        group_by (str): Optional grouping column
+        batch_size (int): Number of rows fetched per round trip
     
-    if count == 0:
+    Returns:
+        dict: Aggregate name to value, or group to such a dict
+    """
+    _validate(funcs, column, group_by)
+    track_values = any(parse_percentile(func) for func in funcs)
+    if not group_by:
+        stats = RunningStats(track_values)
+        for batch in stream_age_batches(batch_size, column):
+            stats.update(batch)
+        return stats.result(funcs)
+    
+    groups = {}
+    for batch in stream_age_batches(batch_size, column, group_by):
+        for group, value in batch:
+            stats = groups.get(group)
+            if stats is None:
+                stats = groups[group] = RunningStats(track_values)
+            stats.add(value)
+    return {group: stats.result(funcs) for group, stats in groups.items()}
+
+
+def aggregate(funcs=("avg",), column="age", group_by=None, mode="auto",
+              batch_size=1000):
+    """
+    Computes aggregates over user_data.
+    
+    Args:
+        funcs (list): Any of avg, count, sum, min, max, var, stddev and
+            percentiles written as "p50", "p95", "p99"
+        column (str): Numeric column to aggregate (default: "age")
+        group_by (str): Optional grouping column
+        mode (str): "sql" to compute in the database, "stream" to compute
+            client side, or "auto" to try SQL first and fall back to
+            streaming if the database cannot run the query
+        batch_size (int): Rows per round trip for the streaming engine
+    
+    Returns:
+        dict: Aggregate name to value, or group to such a dict
+    """
+    if mode not in ("auto", "sql", "stream"):
+        raise ValueError(f"Unknown aggregation mode: {mode}")
+    if mode != "stream":
+        try:
+            return aggregate_sql(funcs, column, group_by)
+        except Error as e:
+            if mode == "sql":
+                raise
+            print(f"Falling back to streaming aggregation: {e}")
+    return aggregate_stream(funcs, column, group_by, batch_size)
+
+
+def calculate_average_age(mode="auto"):
+    """
+    Calculates the average age of all users.
+    The database computes the average when it can; otherwise ages are
+    streamed in batches without loading all data into memory.
+    
+    Args:
+        mode (str): Aggregation mode, see aggregate
+    
+    Returns:
+        float: Average age of users, or 0 if no users found
+    """
+    average = aggregate(("avg",), mode=mode)["avg"]
+    if average is None:
         return 0
     
-    return total_age / count
+    return average
 
 
 def main():
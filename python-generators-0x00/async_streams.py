@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+"""
+Async generator variants of the user streaming functions.
+
+These mirror stream_users, stream_users_in_batches, lazy_paginate and
+stream_user_ages for asyncio code, using the aiomysql driver and an
+unbuffered server-side cursor. With prefetch enabled, the next batch is
+requested from the server while the consumer processes the current one.
+"""
+
+import asyncio
+
+import aiomysql
+
+import db_pool
+
+USER_QUERY = "SELECT user_id, name, email, age FROM user_data"
+KEYSET_QUERY = (
+    "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+)
+
+
+async def async_connect():
+    """
+    Opens an aiomysql connection using the db_pool settings.
+    
+    Returns:
+        aiomysql.Connection: The open connection
+    """
+    config = db_pool.load_config()
+    return await aiomysql.connect(
+        host=config["host"],
+        port=config["port"],
+        user=config["user"],
+        password=config["password"],
+        db=config["database"],
+        autocommit=True
+    )
+
+
+async def _cancel(task):
+    """
+    Cancels a pending prefetch task and waits for it to finish.
+    """
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, aiomysql.Error):
+        pass
+
+
+async def _fetch_batches(query, params, batch_size, prefetch=True,
+                         dictionary=True):
+    """
+    Async generator yielding fetchmany batches of a query's rows.
+    
+    Args:
+        query (str): SQL query to run
+        params (tuple): Query parameters
+        batch_size (int): Number of rows per batch
+        prefetch (bool): Request the next batch before yielding the
+            current one (default: True)
+        dictionary (bool): Return rows as dictionaries (default: True)
+    
+    Yields:
+        list: Batch of rows
+    """
+    connection = await async_connect()
+    cursor_class = aiomysql.SSDictCursor if dictionary else aiomysql.SSCursor
+    pending = None
+    try:
+        cursor = await connection.cursor(cursor_class)
+        await cursor.execute(query, params)
+        pending = asyncio.ensure_future(cursor.fetchmany(batch_size))
+        while True:
+            batch = await pending
+            pending = None
+            if not batch:
+                break
+            if prefetch:
+                pending = asyncio.ensure_future(cursor.fetchmany(batch_size))
+            yield batch
+            if not prefetch:
+                pending = asyncio.ensure_future(cursor.fetchmany(batch_size))
+        await cursor.close()
+    finally:
+        await _cancel(pending)
+        # An unbuffered cursor would read every remaining row on close, so
+        # an abandoned stream just drops the socket instead.
+        connection.close()
+
+
+async def async_stream_users(batch_size=100, prefetch=True):
+    """
+    Async generator streaming rows from user_data one by one.
+    
+    Args:
+        batch_size (int): Rows fetched per round trip
+        prefetch (bool): Overlap fetching with consumption (default: True)
+    
+    Yields:
+        dict: User record
+    """
+    async for batch in _fetch_batches(USER_QUERY, (), batch_size, prefetch,
+                                      dictionary=False):
+        for row in batch:
+            yield {
+                'user_id': row[0],
+                'name': row[1],
+                'email': row[2],
+                'age': int(row[3]) if row[3] == int(row[3]) else float(row[3])
+            }
+
+
+async def async_stream_users_in_batches(batch_size, prefetch=True):
+    """
+    Async generator fetching users from the database in batches.
+    
+    Args:
+        batch_size (int): Number of records to fetch per batch
+        prefetch (bool): Overlap fetching with consumption (default: True)
+    
+    Yields:
+        list: Batch of user records as dictionaries
+    """
+    async for batch in _fetch_batches(USER_QUERY, (), batch_size, prefetch):
+        yield batch
+
+
+async def async_lazy_paginate(page_size, prefetch=True):
+    """
+    Async generator loading user_data page by page with keyset pagination.
+    
+    Args:
+        page_size (int): Number of records per page
+        prefetch (bool): Start the query for the next page before yielding
+            the current one (default: True)
+    
+    Yields:
+        list: Page of user records as dictionaries
+    """
+    connection = await async_connect()
+    pending = None
+
+    async def fetch_page(last_user_id):
+        """Fetches the page that follows last_user_id."""
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(KEYSET_QUERY, (last_user_id, page_size))
+            return await cursor.fetchall()
+
+    try:
+        pending = asyncio.ensure_future(fetch_page(""))
+        while True:
+            page = await pending
+            pending = None
+            if not page:
+                break
+            if prefetch:
+                pending = asyncio.ensure_future(
+                    fetch_page(page[-1]['user_id'])
+                )
+            yield page
+            if not prefetch:
+                pending = asyncio.ensure_future(
+                    fetch_page(page[-1]['user_id'])
+                )
+    finally:
+        await _cancel(pending)
+        connection.close()
+
+
+async def async_stream_user_ages(batch_size=1000, prefetch=True):
+    """
+    Async generator yielding user ages one by one.
+    
+    Args:
+        batch_size (int): Rows fetched per round trip
+        prefetch (bool): Overlap fetching with consumption (default: True)
+    
+    Yields:
+        float: User age
+    """
+    async for batch in _fetch_batches("SELECT age FROM user_data", (),
+                                      batch_size, prefetch, dictionary=False):
+        for row in batch:
+            yield float(row[0])
+
+
+async def async_calculate_average_age(batch_size=1000):
+    """
+    Calculates the average age by streaming ages asynchronously.
+    
+    Returns:
+        float: Average age of users, or 0 if no users found
+    """
+    total_age = 0
+    count = 0
+    async for age in async_stream_user_ages(batch_size):
+        total_age += age
+        count += 1
+    if count == 0:
+        return 0
+    return total_age / count
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing SQL-side and streaming aggregation.
+
+Runs the same aggregates through aggregate_sql and aggregate_stream, both
+over the whole table and grouped by age, and prints the elapsed time of
+each path together with the results so they can be checked for agreement.
+
+Usage:
+    ./bench_aggregates.py [row_count]
+"""
+
+import sys
+import time
+
+import seed
+
+stream_ages = __import__('4-stream_ages')
+
+FUNCS = ("count", "avg", "min", "max", "stddev", "p50", "p95", "p99")
+
+
+def timed(run):
+    """
+    Runs a callable and returns (result, seconds).
+    """
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+
+def main():
+    """
+    Seeds the table and prints timings for both aggregation paths.
+    """
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    seed.create_table(connection)
+    seed.load_rows(connection, seed.synthetic_rows(row_count),
+                   chunk_size=10000, commit_every=1)
+    connection.close()
+
+    for group_by in (None, "age"):
+        label = f"grouped by {group_by}" if group_by else "whole table"
+        sql, sql_seconds = timed(
+            lambda: stream_ages.aggregate_sql(FUNCS, group_by=group_by)
+        )
+        streamed, stream_seconds = timed(
+            lambda: stream_ages.aggregate_stream(
+                FUNCS, group_by=group_by, batch_size=5000
+            )
+        )
+        print(f"{label}: sql {sql_seconds:.3f}s, "
+              f"stream {stream_seconds:.3f}s")
+        if not group_by:
+            print(f"  sql:    {sql}")
+            print(f"  stream: {streamed}")
+        else:
+            print(f"  groups: sql {len(sql)}, stream {len(streamed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Benchmark of async streaming with and without prefetch.
+
+Consumes each async generator while simulating per-batch work with
+asyncio.sleep, and prints the end-to-end time with prefetch on and off.
+With prefetch, the server round trip overlaps the consumer's work.
+
+Usage:
+    ./bench_async_streams.py [row_count] [batch_size] [work_ms]
+"""
+
+import asyncio
+import sys
+import time
+
+import seed
+import async_streams
+
+
+async def consume(batches, work_seconds):
+    """
+    Drains an async generator of batches, sleeping work_seconds per batch.
+    
+    Returns:
+        int: Number of rows consumed
+    """
+    rows = 0
+    async for batch in batches:
+        rows += len(batch)
+        await asyncio.sleep(work_seconds)
+    return rows
+
+
+async def run(batch_size, work_seconds):
+    """
+    Prints end-to-end time per generator for both prefetch settings.
+    """
+    print(f"{'generator':<24} {'prefetch':<9} {'rows':>8} {'seconds':>8}")
+    for name, factory in (
+        ("stream_users_in_batches",
+         lambda prefetch: async_streams.async_stream_users_in_batches(
+             batch_size, prefetch=prefetch)),
+        ("lazy_paginate",
+         lambda prefetch: async_streams.async_lazy_paginate(
+             batch_size, prefetch=prefetch)),
+    ):
+        for prefetch in (False, True):
+            start = time.perf_counter()
+            rows = await consume(factory(prefetch), work_seconds)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<24} {str(prefetch):<9} {rows:>8} {elapsed:>8.2f}")
+
+
+def main():
+    """
+    Seeds the table and runs the benchmark.
+    """
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    work_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    seed.create_table(connection)
+    seed.load_rows(connection, seed.synthetic_rows(row_count),
+                   chunk_size=10000, commit_every=1)
+    connection.close()
+
+    asyncio.run(run(batch_size, work_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing row-dict and column-oriented batches.
+
+Streams user_data with stream_users_in_batches (list of dicts) and with
+stream_user_columns (array.array and, when installed, NumPy), applying the
+age > 25 filter in each layout. Reports rows per second, the number of
+matching rows and the tracemalloc peak.
+
+Usage:
+    ./bench_columnar.py [row_count] [batch_size]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import seed
+
+batches = __import__('1-batch_processing')
+
+
+def rows_layout(batch_size):
+    """
+    Counts users over 25 from row-dict batches.
+    """
+    matched = 0
+    for batch in batches.stream_users_in_batches(batch_size):
+        matched += sum(1 for user in batch if user['age'] > 25)
+    return matched
+
+
+def columns_layout(batch_size, use_numpy):
+    """
+    Counts users over 25 from column-oriented batches.
+    """
+    matched = 0
+    for batch in batches.stream_user_columns(batch_size, use_numpy=use_numpy):
+        mask = batches.column_mask(batch['age'], ">", 25)
+        matched += len(batches.filter_columns(batch, mask)['age'])
+    return matched
+
+
+def measure(run):
+    """
+    Runs a layout and returns (matched rows, seconds, peak bytes).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    matched = run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return matched, elapsed, peak
+
+
+def main():
+    """
+    Seeds the table and prints throughput and memory for every layout.
+    """
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    seed.create_table(connection)
+    seed.load_rows(connection, seed.synthetic_rows(row_count),
+                   chunk_size=10000, commit_every=1)
+    connection.close()
+
+    layouts = [
+        ("rows", lambda: rows_layout(batch_size)),
+        ("array", lambda: columns_layout(batch_size, use_numpy=False)),
+    ]
+    if batches.np is not None:
+        layouts.append(
+            ("numpy", lambda: columns_layout(batch_size, use_numpy=True))
+        )
+
+    print(f"{'layout':<7} {'matched':>9} {'rows/s':>10} {'peak KiB':>10}")
+    for name, run in layouts:
+        matched, elapsed, peak = measure(run)
+        print(f"{name:<7} {matched:>9} {row_count / elapsed:>10.0f} "
+              f"{peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Benchmark comparing offset and keyset pagination over user_data.
+
+Seeds user_data up to the requested number of rows (1M by default) and
+walks the whole table with lazy_paginate in both modes, with and without
+connection reuse, reporting total time, the cost of the first and last
+pages, the number of new connections opened (pool misses for the reused
+connection, one per page otherwise) and the average time per page.
+
+Usage:
+    ./bench_pagination.py [row_count] [page_size]
+"""
+
+import sys
+import time
+
+import seed
+
+pagination = __import__('2-lazy_paginate')
+
+
+def walk(mode, page_size, reuse_connection):
+    """
+    Walks the whole table with lazy_paginate and times every page.
+
+    Args:
+        mode (str): Pagination mode passed to lazy_paginate.
+        page_size (int): Number of records per page.
+        reuse_connection (bool): Passed through to lazy_paginate.
+
+    Returns:
+        tuple: (row count, total seconds, first page seconds,
+            last page seconds)
+    """
+    rows = 0
+    page_times = []
+    start = time.perf_counter()
+    last = start
+    pagination.reset_pagination_stats()
+    for page in pagination.lazy_paginate(
+        page_size, mode=mode, reuse_connection=reuse_connection
+    ):
+        now = time.perf_counter()
+        page_times.append(now - last)
+        last = now
+        rows += len(page)
+    total = time.perf_counter() - start
+    return rows, total, page_times[0], page_times[-1]
+
+
+def main():
+    """
+    Seeds the table and prints timings for both pagination modes.
+    """
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    seed.create_table(connection)
+    seed.load_rows(connection, seed.synthetic_rows(row_count),
+                   chunk_size=10000, commit_every=1)
+    connection.close()
+
+    print(f"{'mode':<8} {'reuse':<6} {'rows':>9} {'total s':>9} "
+          f"{'first ms':>9} {'last ms':>9} {'connects':>9} {'ms/page':>9}")
+    for mode in ("keyset", "offset"):
+        for reuse_connection in (True, False):
+            rows, total, first, last = walk(mode, page_size, reuse_connection)
+            print(f"{mode:<8} {str(reuse_connection):<6} {rows:>9} "
+                  f"{total:>9.2f} {first * 1000:>9.2f} {last * 1000:>9.2f} "
+                  f"{pagination.pagination_stats['connects']:>9} "
+                  f"{pagination.time_per_page() * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
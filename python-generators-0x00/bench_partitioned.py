@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Benchmark of partitioned scans as the number of workers grows.
+
+For each worker count, runs a batch_processing-style filter (age > 25)
+through partitioned_batches and a calculate_average_age-style reduction
+through partitioned_aggregate, and prints rows per second for both.
+
+Usage:
+    ./bench_partitioned.py [row_count] [max_workers]
+"""
+
+import sys
+import time
+
+import seed
+import partitioned_scan
+
+
+def main():
+    """
+    Seeds the table and prints throughput per worker count.
+    """
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    seed.create_table(connection)
+    seed.load_rows(connection, seed.synthetic_rows(row_count),
+                   chunk_size=10000, commit_every=1)
+    connection.close()
+
+    print(f"{'workers':>7} {'filter rows/s':>14} {'matched':>9} "
+          f"{'reduce rows/s':>14} {'avg age':>8}")
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        matched = 0
+        for batch in partitioned_scan.partitioned_batches(
+            5000, workers=workers, predicates=[("age", ">", 25)]
+        ):
+            matched += len(batch)
+        filter_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = partitioned_scan.partitioned_aggregate(
+            ("avg",), workers=workers
+        )
+        reduce_seconds = time.perf_counter() - start
+
+        print(f"{workers:>7} {row_count / filter_seconds:>14.0f} "
+              f"{matched:>9} {row_count / reduce_seconds:>14.0f} "
+              f"{result['avg'] or 0:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
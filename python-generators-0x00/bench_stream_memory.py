@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Memory benchmark for buffered vs. server-side streaming cursors.
+
+Grows user_data through a series of sizes and, at each size, consumes
+stream_users and stream_users_in_batches in both cursor modes while
+tracemalloc records the peak Python heap usage. With server-side cursors
+the peak should stay flat as the table grows, while the buffered baseline
+grows with it.
+
+Usage:
+    ./bench_stream_memory.py [size ...]
+"""
+
+import sys
+import tracemalloc
+
+import seed
+
+stream_users = __import__('0-stream_users').stream_users
+stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+
+DEFAULT_SIZES = (10000, 50000, 100000, 250000)
+
+
+def peak_memory(generator):
+    """
+    Consumes generator and returns the tracemalloc peak in bytes.
+
+    Args:
+        generator: The generator to drain.
+
+    Returns:
+        tuple: (items consumed, peak bytes)
+    """
+    tracemalloc.start()
+    count = 0
+    for _ in generator:
+        count += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak
+
+
+def main():
+    """
+    Prints peak memory per row count for each streaming mode.
+    """
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    connection = seed.connect_to_prodev()
+    if not connection:
+        return
+    seed.create_table(connection)
+
+    print(f"{'rows':>9} {'stream buf KiB':>15} {'stream ss KiB':>14} "
+          f"{'batch buf KiB':>14} {'batch ss KiB':>13}")
+    for size in sizes:
+        seed.load_rows(connection, seed.synthetic_rows(size),
+                       chunk_size=10000, commit_every=1)
+        peaks = [
+            peak_memory(stream_users(server_side=False))[1],
+            peak_memory(stream_users(server_side=True, fetch_size=100))[1],
+            peak_memory(stream_users_in_batches(100, server_side=False))[1],
+            peak_memory(stream_users_in_batches(100, server_side=True))[1],
+        ]
+        print(f"{size:>9} {peaks[0] / 1024:>15.0f} {peaks[1] / 1024:>14.0f} "
+              f"{peaks[2] / 1024:>14.0f} {peaks[3] / 1024:>13.0f}")
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
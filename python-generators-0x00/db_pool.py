@@ -0,0 +1,374 @@
+#!/usr/bin/python3
+"""
+Shared MySQL connection pool for the python-generators-0x00 modules.
+
+Connections are configured once, from a db.ini file and/or environment
+variables (environment wins):
+
+    ALX_DB_CONFIG        path of the INI file (default: db.ini next to
+                         this module), read from its [mysql] section
+    ALX_DB_HOST          host (default: localhost)
+    ALX_DB_PORT          port (default: 3306)
+    ALX_DB_USER          user (default: root)
+    ALX_DB_PASSWORD      password (default: root)
+    ALX_DB_NAME          database (default: ALX_prodev)
+    ALX_DB_POOL_SIZE     maximum open connections (default: 5)
+    ALX_DB_IDLE_TIMEOUT  seconds before an idle connection is closed
+                         (default: 300)
+
+Borrowed connections behave like ordinary mysql.connector connections;
+calling close() returns them to the pool instead of disconnecting.
+"""
+
+import configparser
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+CONFIG_ENV = {
+    "host": "ALX_DB_HOST",
+    "port": "ALX_DB_PORT",
+    "user": "ALX_DB_USER",
+    "password": "ALX_DB_PASSWORD",
+    "database": "ALX_DB_NAME",
+    "pool_size": "ALX_DB_POOL_SIZE",
+    "idle_timeout": "ALX_DB_IDLE_TIMEOUT",
+}
+DEFAULT_CONFIG = {
+    "host": "localhost",
+    "port": "3306",
+    "user": "root",
+    "password": "root",
+    "database": "ALX_prodev",
+    "pool_size": "5",
+    "idle_timeout": "300",
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def load_config(path=None):
+    """
+    Reads connection settings from the INI file and the environment.
+    
+    Args:
+        path (str): INI file to read (default: $ALX_DB_CONFIG or db.ini)
+    
+    Returns:
+        dict: Settings keyed like DEFAULT_CONFIG, with port, pool_size and
+            idle_timeout converted to numbers
+    """
+    config = dict(DEFAULT_CONFIG)
+    path = path or os.environ.get(
+        "ALX_DB_CONFIG",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "db.ini")
+    )
+    parser = configparser.ConfigParser()
+    if parser.read(path) and parser.has_section("mysql"):
+        config.update(parser.items("mysql"))
+    for key, variable in CONFIG_ENV.items():
+        if variable in os.environ:
+            config[key] = os.environ[variable]
+    config["port"] = int(config["port"])
+    config["pool_size"] = int(config["pool_size"])
+    config["idle_timeout"] = float(config["idle_timeout"])
+    return config
+
+
+class PooledConnection:
+    """
+    Proxy for a borrowed connection; close() hands it back to the pool.
+    """
+    def __init__(self, pool, connection):
+        """
+        Wrap a raw connection borrowed from pool.
+        """
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        """
+        Delegates everything else to the raw connection.
+        """
+        if self._connection is None:
+            raise PoolError("Connection has been returned to the pool")
+        return getattr(self._connection, name)
+
+    def close(self):
+        """
+        Returns the connection to the pool. Safe to call more than once.
+        """
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._pool.release(connection)
+
+    def __enter__(self):
+        """
+        Returns the proxy itself.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Returns the connection to the pool.
+        """
+        self.close()
+
+    def __del__(self):
+        """
+        Returns the connection if the borrower forgot to close it.
+        """
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections with health checks and idle
+    eviction.
+    """
+    def __init__(self, config=None, max_size=None, idle_timeout=None,
+                 health_check_interval=30, wait_timeout=30):
+        """
+        Initialize an empty pool; connections are opened on demand.
+        
+        Args:
+            config (dict): Settings as returned by load_config
+            max_size (int): Maximum open connections (default: from config)
+            idle_timeout (float): Seconds an idle connection is kept
+                (default: from config)
+            health_check_interval (float): Idle seconds after which a
+                connection is pinged before being handed out
+            wait_timeout (float): Seconds to wait for a free connection
+                before raising PoolError
+        """
+        config = config or load_config()
+        self.connect_args = {
+            key: config[key]
+            for key in ("host", "port", "user", "password", "database")
+        }
+        self.max_size = max_size or config["pool_size"]
+        self.idle_timeout = idle_timeout or config["idle_timeout"]
+        self.health_check_interval = health_check_interval
+        self.wait_timeout = wait_timeout
+        self.pid = os.getpid()
+        self._idle = []
+        self._open = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "evictions": 0,
+            "failed_health_checks": 0,
+        }
+
+    def _evict_idle(self, now):
+        """
+        Closes connections idle for longer than idle_timeout.
+        Must be called with the condition held.
+        """
+        keep = []
+        for connection, released_at in self._idle:
+            if now - released_at > self.idle_timeout:
+                self._discard(connection)
+                self._stats["evictions"] += 1
+            else:
+                keep.append((connection, released_at))
+        self._idle = keep
+
+    def _discard(self, connection):
+        """
+        Closes a raw connection that will not return to the pool.
+        Must be called with the condition held.
+        """
+        self._open -= 1
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def _healthy(self, connection, released_at, now):
+        """
+        Pings connections that have been idle for a while.
+        """
+        if now - released_at < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Borrows a connection, waiting if the pool is exhausted.
+        
+        Args:
+            timeout (float): Seconds to wait (default: wait_timeout)
+        
+        Returns:
+            PooledConnection: The borrowed connection
+        
+        Raises:
+            PoolError: If no connection became free in time
+            Error: If a new connection could not be opened
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        waited = False
+        wait_start = time.monotonic()
+        while True:
+            with self._condition:
+                candidate = None
+                while True:
+                    now = time.monotonic()
+                    self._evict_idle(now)
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        break
+                    if self._open < self.max_size:
+                        self._open += 1
+                        break
+                    remaining = timeout - (now - wait_start)
+                    if remaining <= 0:
+                        self._record_wait(True, wait_start)
+                        raise PoolError("Connection pool exhausted")
+                    waited = True
+                    self._condition.wait(remaining)
+            if candidate is None:
+                break
+            # The health check pings the server, so it runs without the
+            # condition held; a slow ping must not block other borrowers
+            connection, released_at = candidate
+            if self._healthy(connection, released_at, now):
+                with self._condition:
+                    self._record_wait(waited, wait_start)
+                    self._stats["hits"] += 1
+                return PooledConnection(self, connection)
+            with self._condition:
+                self._stats["failed_health_checks"] += 1
+                self._discard(connection)
+                self._condition.notify()
+        with self._condition:
+            self._record_wait(waited, wait_start)
+            self._stats["misses"] += 1
+        try:
+            connection = mysql.connector.connect(**self.connect_args)
+        except Error:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+        return PooledConnection(self, connection)
+
+    def _record_wait(self, waited, wait_start):
+        """
+        Accounts for time spent waiting for a free connection.
+        Must be called with the condition held.
+        """
+        if waited:
+            self._stats["waits"] += 1
+            self._stats["wait_seconds"] += time.monotonic() - wait_start
+
+    def release(self, connection):
+        """
+        Returns a raw connection to the pool.
+        
+        Connections with an unread result set (an abandoned unbuffered
+        stream) are closed instead, since draining them could take as long
+        as the rest of the scan.
+        """
+        reusable = not getattr(connection, "unread_result", False)
+        if reusable:
+            try:
+                connection.rollback()
+            except Error:
+                reusable = False
+        with self._condition:
+            if reusable and os.getpid() == self.pid:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._discard(connection)
+            self._condition.notify()
+
+    def close_all(self):
+        """
+        Closes every idle connection.
+        """
+        with self._condition:
+            for connection, _ in self._idle:
+                self._discard(connection)
+            self._idle = []
+
+    def stats(self):
+        """
+        Returns pool metrics.
+        
+        Returns:
+            dict: hits, misses, waits, wait_seconds, evictions,
+                failed_health_checks, open, idle and in_use counts
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats["open"] = self._open
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._open - len(self._idle)
+        return stats
+
+
+def get_pool():
+    """
+    Returns the process-wide pool, creating it on first use.
+    
+    A forked child process gets a fresh pool instead of sharing the
+    parent's sockets.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool()
+        return _pool
+
+
+def connect_direct():
+    """
+    Opens a new connection that bypasses the pool.
+    
+    Returns:
+        MySQLConnection: Connection object or None if failed
+    """
+    config = load_config()
+    try:
+        return mysql.connector.connect(
+            **{key: config[key]
+               for key in ("host", "port", "user", "password", "database")}
+        )
+    except Error as e:
+        print(f"Error connecting to database: {e}")
+        return None
+
+
+def connect():
+    """
+    Borrows a connection from the shared pool.
+    
+    Returns:
+        PooledConnection: Connection object or None if failed
+    """
+    try:
+        return get_pool().acquire()
+    except Error as e:
+        print(f"Error connecting to database: {e}")
+        return None
+
+
+def pool_stats():
+    """
+    Returns the shared pool's hit/miss and wait-time metrics.
+    """
+    return get_pool().stats()
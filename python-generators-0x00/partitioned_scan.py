@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+"""
+Parallel partitioned scans of user_data.
+
+The table is split into user_id key ranges, each range is streamed on its
+own connection in a worker process, and results are merged in the parent:
+    - partitioned_batches yields filtered batches as workers produce them,
+      through a bounded queue so at most max_in_flight batches are held in
+      memory at once.
+    - partitioned_aggregate reduces each range to RunningStats in the
+      workers and merges the partial statistics.
+
+Predicates and callables passed to the workers must be picklable, i.e.
+tuples or module-level functions. A database error in any worker is
+raised in the parent as a PartitionScanError instead of returning a
+partial result.
+"""
+
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+batches = __import__('1-batch_processing')
+stream_ages = __import__('4-stream_ages')
+
+_queue = None
+_stop = None
+
+
+class PartitionScanError(RuntimeError):
+    """
+    Raised in the parent when a worker failed to scan its key range.
+    """
+
+
+def partition_bounds(partitions):
+    """
+    Splits user_data into key ranges holding roughly equal row counts.
+    
+    Args:
+        partitions (int): Number of ranges to produce
+    
+    Returns:
+        list: (low, high) user_id bounds; low is inclusive, high exclusive,
+            and None means unbounded
+    """
+    connection = batches.connect_db()
+    if not connection:
+        raise ConnectionError("Could not connect to the database")
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM user_data")
+        total = cursor.fetchone()[0]
+        splits = []
+        for i in range(1, partitions):
+            cursor.execute(
+                "SELECT user_id FROM user_data ORDER BY user_id "
+                "LIMIT 1 OFFSET %s",
+                (total * i // partitions,)
+            )
+            row = cursor.fetchone()
+            if row and (not splits or row[0] > splits[-1]):
+                splits.append(row[0])
+    finally:
+        cursor.close()
+        connection.close()
+    lows = [None] + splits
+    highs = splits + [None]
+    return list(zip(lows, highs))
+
+
+def range_predicates(bounds):
+    """
+    Returns the build_user_query predicates selecting one key range.
+    """
+    low, high = bounds
+    predicates = []
+    if low is not None:
+        predicates.append(("user_id", ">=", low))
+    if high is not None:
+        predicates.append(("user_id", "<", high))
+    return predicates
+
+
+def _init_worker(result_queue, stop_event):
+    """
+    Stores the shared queue and stop event in the worker process.
+    """
+    global _queue, _stop
+    _queue = result_queue
+    _stop = stop_event
+
+
+def _put(item):
+    """
+    Puts item on the shared queue, giving up once the consumer has stopped.
+    """
+    while not _stop.is_set():
+        try:
+            _queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _scan_range(bounds, batch_size, columns, predicates):
+    """
+    Streams one key range and puts its batches on the shared queue.
+    A None item marks the end of the range.
+    """
+    try:
+        for batch in batches.stream_users_in_batches(
+            batch_size, server_side=True, columns=columns,
+            predicates=list(predicates) + range_predicates(bounds),
+            raise_errors=True
+        ):
+            if not _put(batch):
+                return
+    except Exception as e:
+        # Driver exceptions do not always survive pickling
+        raise PartitionScanError(f"Scan of range {bounds} failed: {e}") from None
+    _put(None)
+
+
+def _reduce_range(bounds, batch_size, funcs, column, group_by):
+    """
+    Reduces one key range to RunningStats, or a dict of them per group.
+    """
+    try:
+        return _reduce_batches(bounds, batch_size, funcs, column, group_by)
+    except Exception as e:
+        # Driver exceptions do not always survive pickling
+        raise PartitionScanError(f"Scan of range {bounds} failed: {e}") from None
+
+
+def _reduce_batches(bounds, batch_size, funcs, column, group_by):
+    """
+    Does the work of _reduce_range.
+    """
+    track_values = any(stream_ages.parse_percentile(func) for func in funcs)
+    if not group_by:
+        columns = [column]
+        stats = stream_ages.RunningStats(track_values)
+    else:
+        columns = [group_by] if group_by == column else [group_by, column]
+        stats = {}
+    for batch in batches.stream_user_columns(
+        batch_size, server_side=True, columns=columns,
+        predicates=range_predicates(bounds), raise_errors=True
+    ):
+        if not group_by:
+            stats.update(batch[column])
+            continue
+        for group, value in zip(batch[group_by], batch[column]):
+            group_stats = stats.get(group)
+            if group_stats is None:
+                group_stats = stats[group] = stream_ages.RunningStats(
+                    track_values
+                )
+            group_stats.add(value)
+    return stats
+
+
+def partitioned_batches(batch_size, workers=4, columns=None, predicates=(),
+                        partitions=None, max_in_flight=None):
+    """
+    Generator that streams filtered batches from parallel range scans.
+    
+    Batches arrive in completion order, not key order.
+    
+    Args:
+        batch_size (int): Number of records per batch
+        workers (int): Number of worker processes
+        columns (list): Columns to select, or None for all user columns
+        predicates (list): Filters compiled by build_user_query
+        partitions (int): Number of key ranges (default: workers)
+        max_in_flight (int): Batches buffered between workers and the
+            consumer (default: 2 * workers)
+    
+    Yields:
+        list: Batch of user records as dictionaries
+    
+    Raises:
+        PartitionScanError: If a worker could not scan its range
+    """
+    bounds = partition_bounds(partitions or workers)
+    context = multiprocessing.get_context()
+    result_queue = context.Queue(maxsize=max_in_flight or 2 * workers)
+    stop_event = context.Event()
+    
+    with ProcessPoolExecutor(workers, mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(result_queue, stop_event)) as pool:
+        futures = [
+            pool.submit(_scan_range, bound, batch_size, columns,
+                        tuple(predicates))
+            for bound in bounds
+        ]
+        try:
+            finished = 0
+            while finished < len(futures):
+                try:
+                    item = result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    for future in futures:
+                        if future.done() and future.exception():
+                            raise future.exception()
+                    continue
+                if item is None:
+                    finished += 1
+                else:
+                    yield item
+        finally:
+            stop_event.set()
+            while not all(future.done() for future in futures):
+                try:
+                    result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+
+def partitioned_aggregate(funcs=("avg",), workers=4, column="age",
+                          group_by=None, batch_size=5000, partitions=None):
+    """
+    Computes aggregates by reducing key ranges in parallel.
+    
+    Args:
+        funcs (list): Aggregate names, see RunningStats.result
+        workers (int): Number of worker processes
+        column (str): Numeric column to aggregate
+        group_by (str): Optional grouping column
+        batch_size (int): Rows per round trip in each worker
+        partitions (int): Number of key ranges (default: workers)
+    
+    Returns:
+        dict: Aggregate name to value, or group to such a dict
+    
+    Raises:
+        PartitionScanError: If a worker could not scan its range
+    """
+    stream_ages._validate(funcs, column, group_by)
+    bounds = partition_bounds(partitions or workers)
+    track_values = any(stream_ages.parse_percentile(func) for func in funcs)
+    total = stream_ages.RunningStats(track_values)
+    groups = {}
+    
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(_reduce_range, bound, batch_size, funcs, column,
+                        group_by)
+            for bound in bounds
+        ]
+        for future in futures:
+            partial = future.result()
+            if not group_by:
+                total.merge(partial)
+                continue
+            for group, stats in partial.items():
+                if group in groups:
+                    groups[group].merge(stats)
+                else:
+                    groups[group] = stats
+    
+    if not group_by:
+        return total.result(funcs)
+    return {group: stats.result(funcs) for group, stats in groups.items()}
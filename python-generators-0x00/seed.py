@@ -1,16 +1,28 @@
 #!/usr/bin/python3
 import mysql.connector
 import csv
+import itertools
+import os
+import sqlite3
+import time
 import uuid
 from mysql.connector import Error
 
+import db_pool
+
+SYNTHETIC_NAMESPACE = uuid.UUID("6f1c3a52-1c43-4d8e-9a57-0f1b5f0a4b11")
+# user_ids for CSV rows that have none are derived from the row content
+CSV_NAMESPACE = uuid.uuid5(SYNTHETIC_NAMESPACE, "csv")
+
 def connect_db():
     """Connects to the MySQL database server."""
+    config = db_pool.load_config()
     try:
         connection = mysql.connector.connect(
-            host="localhost",
-            user="your_username",  # Replace with your MySQL username
-            password="your_password"  # Replace with your MySQL password
+            host=config["host"],
+            port=config["port"],
+            user=config["user"],
+            password=config["password"]
         )
         if connection.is_connected():
             return connection
@@ -31,22 +43,35 @@ def create_database(connection):
         cursor.close()
 
 def connect_to_prodev():
-    """Connects to the ALX_prodev database."""
+    """Borrows a connection to the ALX_prodev database from the shared pool."""
+    return db_pool.connect()
+
+def connect_sqlite(db_path="ALX_prodev.db"):
+    """Connects to a SQLite file holding the user_data table, for offline use."""
     try:
-        connection = mysql.connector.connect(
-            host="localhost",
-            user="your_username",  # Replace with your MySQL username
-            password="your_password",  # Replace with your MySQL password
-            database="ALX_prodev"
-        )
-        if connection.is_connected():
-            return connection
-    except Error as e:
-        print(f"Error connecting to ALX_prodev: {e}")
+        return sqlite3.connect(db_path)
+    except sqlite3.Error as e:
+        print(f"Error connecting to SQLite database {db_path}: {e}")
         return None
 
+def is_sqlite(connection):
+    """Returns True if connection is a SQLite connection rather than MySQL."""
+    return isinstance(connection, sqlite3.Connection)
+
 def create_table(connection):
     """Creates the user_data table if it does not exist."""
+    if is_sqlite(connection):
+        connection.execute("""
+        CREATE TABLE IF NOT EXISTS user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age REAL NOT NULL
+        );
+        """)
+        connection.commit()
+        print("Table user_data created successfully")
+        return
     try:
         cursor = connection.cursor()
         create_table_query = """
@@ -66,36 +91,136 @@ def create_table(connection):
     finally:
         cursor.close()
 
+def _csv_row_to_record(row):
+    """Converts a CSV row into a (user_id, name, email, age) tuple.
+
+    Rows without a user_id get one derived from their content, so loading the
+    same file again does not create duplicates.
+    """
+    age = float(row['age'])
+    if row['user_id']:
+        # Ensure user_id is a valid UUID
+        user_id = str(uuid.UUID(row['user_id']))
+    else:
+        user_id = str(uuid.uuid5(
+            CSV_NAMESPACE, f"{row['name']}\x1f{row['email']}\x1f{age}"))
+    return (user_id, row['name'], row['email'], age)
+
+def synthetic_rows(count, start=0):
+    """
+    Generates count synthetic user_data records starting at row number start.
+
+    user_ids are derived from the row number, so loading the same range twice
+    does not create duplicates.
+    """
+    for i in range(start, start + count):
+        yield (str(uuid.uuid5(SYNTHETIC_NAMESPACE, str(i))), f"User {i}",
+               f"user{i}@example.com", 18 + i % 80)
+
+def _read_checkpoint(checkpoint_file):
+    """Returns the number of rows committed by a previous run, or 0."""
+    if not checkpoint_file or not os.path.exists(checkpoint_file):
+        return 0
+    with open(checkpoint_file, encoding='utf-8') as file:
+        return int(file.read().strip() or 0)
+
+def _write_checkpoint(checkpoint_file, committed):
+    """Atomically records the number of committed rows."""
+    tmp_file = f"{checkpoint_file}.tmp"
+    with open(tmp_file, mode='w', encoding='utf-8') as file:
+        file.write(str(committed))
+    os.replace(tmp_file, checkpoint_file)
+
+def load_rows(connection, rows, chunk_size=1000, commit_every=10,
+              checkpoint_file=None):
+    """
+    Bulk inserts (user_id, name, email, age) records into user_data.
+
+    Records are sent chunk_size at a time with executemany and a single
+    INSERT IGNORE (MySQL) or INSERT OR IGNORE (SQLite) statement, so existing
+    user_ids are skipped by the server instead of being checked one by one.
+    The transaction is committed every commit_every chunks. When
+    checkpoint_file is given, the number of committed records is written to
+    it after each commit and that many records are skipped on the next run,
+    so an interrupted load resumes from the last committed chunk. If the
+    load fails, the uncommitted chunks are rolled back so the table matches
+    the checkpoint.
+
+    Returns a dict with the rows processed, rows inserted, elapsed seconds
+    and rows per second.
+    """
+    if is_sqlite(connection):
+        insert_query = """
+        INSERT OR IGNORE INTO user_data (user_id, name, email, age)
+        VALUES (?, ?, ?, ?)
+        """
+    else:
+        insert_query = """
+        INSERT IGNORE INTO user_data (user_id, name, email, age)
+        VALUES (%s, %s, %s, %s)
+        """
+    committed = _read_checkpoint(checkpoint_file)
+    rows = itertools.islice(rows, committed, None)
+    processed = committed
+    inserted = 0
+    chunks_since_commit = 0
+    start = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            cursor.executemany(insert_query, chunk)
+            inserted += max(cursor.rowcount, 0)
+            processed += len(chunk)
+            chunks_since_commit += 1
+            if chunks_since_commit >= commit_every:
+                connection.commit()
+                chunks_since_commit = 0
+                if checkpoint_file:
+                    _write_checkpoint(checkpoint_file, processed)
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    if checkpoint_file and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+    elapsed = time.perf_counter() - start
+    loaded = processed - committed
+    return {
+        'processed': processed,
+        'inserted': inserted,
+        'seconds': elapsed,
+        'rows_per_second': loaded / elapsed if elapsed else 0.0,
+    }
+
+def bulk_insert_data(connection, csv_file, chunk_size=1000, commit_every=10,
+                     checkpoint_file=None):
+    """
+    Streams the CSV file into user_data in chunks, see load_rows.
+
+    Returns the load_rows statistics.
+    """
+    with open(csv_file, mode='r', encoding='utf-8') as file:
+        records = (_csv_row_to_record(row) for row in csv.DictReader(file))
+        return load_rows(connection, records, chunk_size=chunk_size,
+                         commit_every=commit_every,
+                         checkpoint_file=checkpoint_file)
+
 def insert_data(connection, csv_file):
     """Inserts data from the CSV file into the user_data table if it does not exist."""
     try:
-        cursor = connection.cursor()
-        with open(csv_file, mode='r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                # Check if user_id already exists
-                cursor.execute("SELECT user_id FROM user_data WHERE user_id = %s", (row['user_id'],))
-                if cursor.fetchone():
-                    continue  # Skip if user_id exists
-                
-                # Insert data
-                insert_query = """
-                INSERT INTO user_data (user_id, name, email, age)
-                VALUES (%s, %s, %s, %s)
-                """
-                # Ensure user_id is a valid UUID
-                user_id = str(uuid.UUID(row['user_id'])) if row['user_id'] else str(uuid.uuid4())
-                data = (user_id, row['name'], row['email'], float(row['age']))
-                cursor.execute(insert_query, data)
-        
-        connection.commit()
-        print("Data inserted successfully")
-    except Error as e:
+        stats = bulk_insert_data(connection, csv_file,
+                                 checkpoint_file=f"{csv_file}.checkpoint")
+        print(f"Data inserted successfully: {stats['inserted']} new rows, "
+              f"{stats['rows_per_second']:.0f} rows/s")
+    except (Error, sqlite3.Error) as e:
         print(f"Error inserting data: {e}")
     except Exception as e:
         print(f"Error reading CSV file: {e}")
-    finally:
-        cursor.close()
 
 def stream_user_data():
     """Generator function to stream rows from the user_data table one by one."""